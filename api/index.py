@@ -1,22 +1,69 @@
 # api/index.py
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
 import re
-import networkx as nx
-import numpy as np
-from fuzzywuzzy import process, fuzz
-from datetime import datetime, timedelta
-from dateutil import parser as date_parser
+from datetime import datetime, timedelta, timezone
 import hashlib
+import importlib
+import importlib.util
 import logging
 import os
+import sys
 import json
+import threading
+import queue
+import io
+import cProfile
+import pstats
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from collections import OrderedDict
+import time
+import uuid
+import zlib
+import gzip
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-import firebase_admin
-from firebase_admin import credentials, firestore
+class _Lazy:
+    """Stands in for a module or client and loads it on first attribute access.
+
+    Scraping and modeling dependencies (and the Firestore client) cost
+    hundreds of ms to import; read-only cold starts should not pay for them.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._loader()
+        return getattr(self._obj, name)
+
+def _lazy_module(name):
+    return _Lazy(lambda: importlib.import_module(name))
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+requests = _lazy_module("requests")
+bs4 = _lazy_module("bs4")
+etree = _lazy_module("lxml.etree")
+lxml_html = _lazy_module("lxml.html")
+nx = _lazy_module("networkx")
+np = _lazy_module("numpy")
+process = _lazy_module("fuzzywuzzy.process")
+fuzz = _lazy_module("fuzzywuzzy.fuzz")
+date_parser = _lazy_module("dateutil.parser")
+firestore = _lazy_module("firebase_admin.firestore")
+HAVE_LXML = importlib.util.find_spec("lxml") is not None  # optional: fall back to BeautifulSoup backends
 
 # ──────────────────────────────────────────────────────────────────────────────
 # App & Firebase init
@@ -25,53 +72,58 @@ logging.basicConfig(level=logging.INFO)
 app = Flask(__name__)
 CORS(app)
 
-sa = json.loads(os.environ["FIREBASE_SA_KEY"])
-cred = credentials.Certificate(sa)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+def _firestore_client():
+    """Initialise firebase_admin on first use and hand back the shared client.
+
+    With FIRESTORE_EMULATOR_HOST set and no service account, talks to the local
+    emulator instead; together with IPL_SOURCE_BASE pointed at recorded pages this
+    runs the whole refresh offline (for benchmarks and regression checks).
+    """
+    if os.environ.get("FIRESTORE_EMULATOR_HOST") and "FIREBASE_SA_KEY" not in os.environ:
+        return firestore.Client(project=os.environ.get("GOOGLE_CLOUD_PROJECT", "demo-ipl2025"))
+    import firebase_admin
+    from firebase_admin import credentials
+    sa = json.loads(os.environ["FIREBASE_SA_KEY"])
+    cred = credentials.Certificate(sa)
+    firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+db = _Lazy(_firestore_client)
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Helper functions (all unchanged)
+# Helper functions
 # ──────────────────────────────────────────────────────────────────────────────
-def overs_to_decimal(overs_str):
-    overs_str = overs_str.replace(" ov", "").strip()
-    if "." in overs_str:
-        whole, balls = overs_str.split(".")
-        try:
-            whole = int(whole)
-            balls = int(balls)
-        except ValueError:
-            return float(overs_str)
-        return whole + (balls / 6)
-    else:
-        return float(overs_str)
-
-def decimal_to_overs(decimal_overs):
-    whole = int(decimal_overs)
-    balls = round((decimal_overs - whole) * 6)
-    if balls == 6:
-        whole += 1
-        balls = 0
-    return f"{whole}.{balls}"
-
-def process_innings(team_info):
-    score_str = team_info["score"].strip()
-    actual_overs = overs_to_decimal(team_info["overs"])
-    if "/" in score_str:
-        runs_str, wickets_str = score_str.split("/")
-        runs = int(runs_str.strip())
-        wickets = wickets_str.strip()
-        if wickets == "10":
-            batting_overs = 20.0
-            bowling_overs = 20.0
-        else:
-            batting_overs = actual_overs
-            bowling_overs = actual_overs
-    else:
-        runs = int(score_str)
-        batting_overs = 20.0
-        bowling_overs = 20.0
-    return runs, batting_overs, bowling_overs
+def overs_to_balls(overs_str):
+    """Legal balls in an overs string such as "19.3 ov" (19 overs and 3 balls)."""
+    whole, _, balls = overs_str.replace(" ov", "").strip().partition(".")
+    return int(whole)*6 + (int(balls) if balls else 0)
+
+def balls_to_overs(balls):
+    return f"{balls // 6}.{balls % 6}"
+
+SITE_DATE_FORMAT = "%a, %d %b %Y, %I:%M %p"  # "Sat, 22 Mar 2025, 07:30 PM" (+ " IST")
+SITE_TZ = timezone(timedelta(hours=5, minutes=30))  # Date_Time strings are IST wall time
+
+@lru_cache(maxsize=4096)
+def parse_match_date(text):
+    """Naive site-local datetime for a Date_Time string; raises ValueError if unreadable.
+
+    The site's own format goes through strptime; anything else (query params,
+    older documents) falls back to dateutil. Memoized: the same strings come
+    back on every refresh and read.
+    """
+    try:
+        return datetime.strptime(text.strip().removesuffix(" IST"), SITE_DATE_FORMAT)
+    except ValueError:
+        pass
+    try:
+        return date_parser.parse(text).replace(tzinfo=None)
+    except OverflowError as e:
+        raise ValueError(str(e))
+
+def site_epoch(d):
+    """Seconds since epoch for a naive site-local (IST) datetime."""
+    return int(d.replace(tzinfo=SITE_TZ).timestamp())
 
 team_abbr_map = {
     "CSK": "Chennai Super Kings", "MI": "Mumbai Indians", "RCB": "Royal Challengers Bengaluru",
@@ -123,313 +175,1533 @@ canonical_teams = [
     "Punjab Kings", "Rajasthan Royals", "Gujarat Titans", "Lucknow Super Giants"
 ]
 
-def get_full_team_name(name):
-    if not name:
-        return name
-    cleaned_name = name.strip().lower()
-    for key, value in team_abbr_map.items():
-        if cleaned_name == key.lower():
+class TeamResolver:
+    """Team-name lookup: a case-folded alias index, then a bounded memo of fuzzy results.
+
+    Misses (including names that fuzzy matching could not place) are memoized
+    too, and the counters make source-site naming drift visible.
+    """
+    def __init__(self, aliases, canonical, memo_size=512):
+        self.index = {}
+        for key, value in aliases.items():
+            self.index.setdefault(key.lower(), value)
+        self.canonical = canonical
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.fuzzy_fallbacks = 0
+        self.unresolved = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, name):
+        if not name:
+            return name
+        cleaned_name = name.strip().lower()
+        value = self.index.get(cleaned_name)
+        if value is not None:
+            self.hits += 1
             return value
-    match, score = process.extractOne(cleaned_name, canonical_teams, scorer=fuzz.token_sort_ratio)
-    if score > 80:
-        logging.info(f"Fuzzy matched '{name}' to '{match}' (score: {score})")
-        return match
-    logging.warning(f"No match found for team name: '{name}'")
-    return name
-
-def fetch_ipl_data(since=None):
-    url = "https://timesofindia.indiatimes.com/sports/cricket/ipl/results"
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+
+        with self._lock:
+            self.misses += 1
+            if cleaned_name in self.memo:
+                self.memo.move_to_end(cleaned_name)
+                match = self.memo[cleaned_name]
+                return match if match is not None else name
+
+        match, score = process.extractOne(cleaned_name, self.canonical, scorer=fuzz.token_sort_ratio)
+        with self._lock:
+            self.fuzzy_fallbacks += 1
+            if score > 80:
+                logging.info(f"Fuzzy matched '{name}' to '{match}' (score: {score})")
+            else:
+                self.unresolved += 1
+                logging.warning(f"No match found for team name: '{name}'")
+                match = None
+            self.memo[cleaned_name] = match
+            if len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+        return match if match is not None else name
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "fuzzy_fallbacks": self.fuzzy_fallbacks,
+            "unresolved": self.unresolved,
+            "drifted_names": sorted(self.memo),
+        }
+
+team_resolver = TeamResolver(team_abbr_map, canonical_teams)
+
+def get_full_team_name(name):
+    return team_resolver.resolve(name)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Refresh instrumentation: per-stage timings and counters, kept in Firestore
+# ──────────────────────────────────────────────────────────────────────────────
+METRICS_HISTORY = int(os.environ.get("METRICS_HISTORY", "50"))
+PROFILE_TOP_N = 40
+
+class RefreshMetrics:
+    """Wall time (ms) per stage and event counters for one refresh run.
+
+    http is summed over requests, so with prefetching it can exceed the
+    scrape stage that contains it; graph, model, parse and extract nest
+    inside scrape as well.
+    """
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self.stages = {}
+        self.counters = {}
+        self.status = "ok"
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, (time.perf_counter() - t0) * 1000)
+
+    def add_time(self, name, ms):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        return {
+            "started": self.started.isoformat(),
+            "status": self.status,
+            "stages": {k: round(v, 2) for k, v in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+def metrics_history_ref():
+    return db.collection("iplCache").document("refreshHistory")
+
+def record_refresh_metrics(metrics):
+    """Log the run as one JSON line and append it to the rolling history doc."""
+    run = metrics.to_dict()
+    logging.info(json.dumps({"event": "refresh", **run}))
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise Exception(f"Failed to retrieve page: Status code {response.status_code}")
-    except Exception as e:
-        logging.error(f"Error fetching IPL results page: {e}")
-        return [], []
+        doc = metrics_history_ref().get()
+        runs = doc.to_dict().get("runs", []) if doc.exists else []
+        metrics_history_ref().set({"runs": (runs + [run])[-METRICS_HISTORY:]})
+    except Exception:
+        logging.exception("Failed to store refresh metrics")
+
+def prometheus_metrics(runs):
+    """Prometheus text exposition of the latest run, history averages and resolver counters."""
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"')
+    lines = [
+        "# HELP ipl_refresh_runs Refresh runs kept in the rolling history.",
+        "# TYPE ipl_refresh_runs gauge",
+        f"ipl_refresh_runs {len(runs)}",
+        "# HELP ipl_refresh_errors Failed refresh runs in the rolling history.",
+        "# TYPE ipl_refresh_errors gauge",
+        f"ipl_refresh_errors {sum(r.get('status') != 'ok' for r in runs)}",
+    ]
+    if runs:
+        last = runs[-1]
+        started = datetime.fromisoformat(last["started"]).timestamp()
+        lines += [
+            "# HELP ipl_refresh_last_run_timestamp_seconds Start time of the most recent refresh.",
+            "# TYPE ipl_refresh_last_run_timestamp_seconds gauge",
+            f"ipl_refresh_last_run_timestamp_seconds {started:.0f}",
+            "# HELP ipl_refresh_stage_ms Wall time per stage in the most recent refresh.",
+            "# TYPE ipl_refresh_stage_ms gauge",
+        ]
+        lines += [f'ipl_refresh_stage_ms{{stage="{esc(k)}"}} {v}' for k, v in sorted(last["stages"].items())]
+        lines += [
+            "# HELP ipl_refresh_events Counters from the most recent refresh.",
+            "# TYPE ipl_refresh_events gauge",
+        ]
+        lines += [f'ipl_refresh_events{{name="{esc(k)}"}} {v}' for k, v in sorted(last["counters"].items())]
+        totals = {}
+        for r in runs:
+            for k, v in r["stages"].items():
+                totals.setdefault(k, []).append(v)
+        lines += [
+            "# HELP ipl_refresh_stage_ms_avg Mean wall time per stage over the rolling history.",
+            "# TYPE ipl_refresh_stage_ms_avg gauge",
+        ]
+        lines += [f'ipl_refresh_stage_ms_avg{{stage="{esc(k)}"}} {round(sum(v)/len(v), 2)}' for k, v in sorted(totals.items())]
+    lines += [
+        "# HELP ipl_team_resolver Team-name resolver counters for this instance.",
+        "# TYPE ipl_team_resolver counter",
+    ]
+    lines += [f'ipl_team_resolver{{name="{esc(k)}"}} {v}' for k, v in team_resolver.stats().items()
+              if isinstance(v, (int, float))]
+    return "\n".join(lines) + "\n"
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Scrape context: one download + one parse per source page per refresh
+# ──────────────────────────────────────────────────────────────────────────────
+SOURCE_BASE = os.environ.get("IPL_SOURCE_BASE", "https://timesofindia.indiatimes.com")
+RESULTS_URL = f"{SOURCE_BASE}/sports/cricket/ipl/results"
+SCHEDULE_URL = f"{SOURCE_BASE}/sports/cricket/ipl/schedule"
+
+SCRAPE_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", "8"))
+SCRAPE_TIMEOUT = float(os.environ.get("SCRAPE_TIMEOUT", "10"))
+SCRAPE_RETRIES = int(os.environ.get("SCRAPE_RETRIES", "3"))
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Page cache: conditional requests + content hashes across refreshes
+# ──────────────────────────────────────────────────────────────────────────────
+PAGE_CACHE = os.environ.get("PAGE_CACHE", "firestore")  # firestore | disk | off
+PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", "/tmp/ipl-page-cache")
+PAGE_CACHE_TTL = float(os.environ.get("PAGE_CACHE_TTL_HOURS", "168")) * 3600
+PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+class DiskCacheBackend:
+    """One JSON file per URL under a local directory (tests, local dev, warm /tmp)."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key):
+        """The entry, with stored_at from the file's mtime (which touch moves)."""
+        try:
+            with open(self._file(key)) as f:
+                entry = json.load(f)
+            entry["stored_at"] = os.path.getmtime(self._file(key))
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        tmp = self._file(key) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._file(key))
+        if "stored_at" in entry:
+            self.touch(key, entry["stored_at"])
+
+    def touch(self, key, stored_at):
+        try:
+            os.utime(self._file(key), (stored_at, stored_at))
+        except OSError:
+            pass
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def write(self, puts=(), touches=(), deletes=()):
+        for key, entry in puts:
+            self.put(key, entry)
+        for key, stored_at in touches:
+            self.touch(key, stored_at)
+        for key in deletes:
+            self.delete(key)
+
+    def entries(self):
+        """(key, stored_at, size) for every cached page."""
+        out = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                full = os.path.join(self.path, name)
+                out.append((name[:-5], os.path.getmtime(full), os.path.getsize(full)))
+        return out
+
+class FirestoreCacheBackend:
+    """Pages stored as zlib-compressed blobs in a Firestore collection (production)."""
+    MAX_DOC_BYTES = 1_000_000
+
+    def __init__(self, client, collection="pageCache"):
+        self.coll = client.collection(collection)
+
+    def get(self, key):
+        doc = self.coll.document(key).get()
+        d = doc.to_dict() if doc.exists else None
+        if not d or "blob" not in d:  # missing, or only a stored_at bump landed after an eviction
+            return None
+        entry = json.loads(zlib.decompress(d["blob"]))
+        entry["stored_at"] = d["stored_at"]
+        return entry
+
+    def write(self, puts=(), touches=(), deletes=()):
+        """puts [(key, entry)], touches [(key, stored_at)] and deletes [key] in WriteBatches;
+        a touch merges stored_at alone, so the blob is not re-sent."""
+        ops = []
+        for key, entry in puts:
+            blob = zlib.compress(json.dumps(entry).encode())
+            if len(blob) > self.MAX_DOC_BYTES:
+                logging.info(f"Page cache entry for {entry.get('url')} too large ({len(blob)} bytes), not stored")
+                continue
+            ops.append(("set", self.coll.document(key), {"blob": blob, "stored_at": entry["stored_at"], "size": len(blob)}))
+        ops += [("set", self.coll.document(key), {"stored_at": stored_at}, True) for key, stored_at in touches]
+        ops += [("delete", self.coll.document(key), None) for key in deletes]
+        if ops:
+            commit_in_batches(ops)
+
+    def entries(self):
+        return [(d.id, d.get("stored_at"), d.get("size")) for d in self.coll.select(["stored_at", "size"]).stream()]
+
+class PageCache:
+    """Stores page bodies keyed by URL with their validators and a content hash.
+
+    Parsed records are stored next to the body, so a page that comes back
+    304 or byte-identical never goes through BeautifulSoup again. A 304 only
+    bumps stored_at, so pages that keep revalidating do not expire.
+    reads/writes count the entries read and written through the backend.
+    """
+    def __init__(self, backend, ttl=PAGE_CACHE_TTL, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def _count(self, reads=0, writes=0):
+        with self._lock:
+            self.reads += reads
+            self.writes += writes
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def lookup(self, url):
+        self._count(reads=1)
+        entry = self.backend.get(self.key(url))
+        if entry and time.time() - entry["stored_at"] > self.ttl:
+            return None
+        return entry
+
+    def save(self, stored, touched):
+        """Write new or changed entries and bump stored_at on revalidated ones, in one backend write."""
+        now = time.time()
+        for entry in stored + touched:
+            entry["stored_at"] = now
+        self._count(writes=len(stored) + len(touched))
+        self.backend.write(puts=[(self.key(e["url"]), e) for e in stored],
+                           touches=[(self.key(e["url"]), now) for e in touched])
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under max_bytes."""
+        now = time.time()
+        live, doomed = [], []
+        entries = self.backend.entries()
+        self._count(reads=len(entries))
+        for key, stored_at, size in entries:
+            if stored_at is None or now - stored_at > self.ttl:
+                doomed.append(key)
+            else:
+                live.append((stored_at, key, size or 0))
+        total = sum(size for _, _, size in live)
+        for _, key, size in sorted(live):
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        self._count(writes=len(doomed))
+        self.backend.write(deletes=doomed)
+
+def default_page_cache():
+    if PAGE_CACHE == "disk":
+        return PageCache(DiskCacheBackend(PAGE_CACHE_DIR))
+    if PAGE_CACHE == "firestore":
+        return PageCache(FirestoreCacheBackend(db))
+    return None
+
+# ──────────────────────────────────────────────────────────────────────────────
+# HTML parsing backends over one shared extraction spec
+# ──────────────────────────────────────────────────────────────────────────────
+# key -> (tag, class, mode). "exact": the class attribute equals the string
+# (BeautifulSoup's class_="a b" rule); "all": the element has every class listed.
+EXTRACTION_SPEC = {
+    "result_anchor": ("a", "ejgS5 DuVhK ra0fi", "exact"),
+    "fixture_anchor": ("a", "ejgS5 GsXWY", "all"),
+    "date_section": ("div", "ieLQJ", "all"),
+    "div": ("div", None, "all"),
+    "p": ("p", None, "all"),
+    "span": ("span", None, "all"),
+    "venue": ("div", "y_Y0B", "all"),
+    "location": ("div", "otuuQ", "all"),
+    "fixture_header": ("div", "B2Exg", "all"),
+    "match_number": ("div", "cONiu", "all"),
+    "teams": ("div", "C81t6", "all"),
+    "team": ("div", "U5fiW", "all"),
+    "team_name": ("div", "WkFo7", "all"),
+    "score_section": ("div", "hPK5L", "all"),
+    "score": ("div", "n7m6x", "all"),
+    "overs": ("div", "WbVlv", "all"),
+    "outcome": ("div", "bmG9a", "all"),
+    # in-progress fixture page; assumed to share the result card's markup (see LIVE_MODE)
+    "live_teams": ("div", "C81t6", "all"),
+    "live_team": ("div", "U5fiW", "all"),
+    "live_team_name": ("div", "WkFo7", "all"),
+    "live_score_section": ("div", "hPK5L", "all"),
+    "live_score": ("div", "n7m6x", "all"),
+    "live_overs": ("div", "WbVlv", "all"),
+    "live_status": ("div", "bmG9a", "all"),
+    "detail_root": ("div", "cQWcQ", "all"),
+    "h2h": ("div", "tVu1k", "all"),
+    "h2h_item": ("div", "OAk24", "all"),
+    "perf": ("div", "t66hp", "all"),
+    "perf_row": ("div", "U5ktS", "all"),
+    "perf_team": ("div", "CCcyO", "all"),
+    "perf_stats": ("div", "vtQ9d", "all"),
+    "played": ("strong", "_donp", "all"),
+    "won": ("strong", "PqVJY", "all"),
+    "win_pct": ("strong", "OngzT", "all"),
+}
+HTML_PARSER = os.environ.get("HTML_PARSER", "lxml" if HAVE_LXML else "strainer")  # lxml | strainer | soup
+
+class SoupBackend:
+    """BeautifulSoup + html.parser. With strain=True only the requested anchors are built."""
+    def __init__(self, strain=False):
+        self.strain = strain
+        self.rules = {}
+        for key, (tag, cls, mode) in EXTRACTION_SPEC.items():
+            if cls is None:
+                self.rules[key] = (tag, {})
+            elif mode == "exact" or " " not in cls:
+                self.rules[key] = (tag, {"class_": cls})
+            else:
+                wanted = cls.split()
+                self.rules[key] = (tag, {"class_": lambda x, wanted=wanted: x and all(c in x.split() for c in wanted)})
+
+    def parse(self, text, only=None):
+        if self.strain and only:
+            tag, kw = self.rules[only]
+            return bs4.BeautifulSoup(text, "html.parser", parse_only=bs4.SoupStrainer(tag, **kw))
+        return bs4.BeautifulSoup(text, "html.parser")
+
+    def find(self, node, key):
+        tag, kw = self.rules[key]
+        return node.find(tag, **kw)
+
+    def find_all(self, node, key):
+        tag, kw = self.rules[key]
+        return node.find_all(tag, **kw)
+
+    def text(self, node):
+        return node.get_text(strip=True)
+
+    def raw_text(self, node):
+        return node.text
+
+    def attr(self, node, name):
+        return node.get(name)
+
+class LxmlBackend:
+    """lxml.html with one precompiled XPath per spec key."""
+    def __init__(self):
+        self.all_xp, self.first_xp = {}, {}
+        for key, (tag, cls, mode) in EXTRACTION_SPEC.items():
+            if cls is None:
+                cond = ""
+            elif mode == "exact":
+                cond = f"[@class='{cls}']"
+            else:
+                cond = "".join(f"[contains(concat(' ', normalize-space(@class), ' '), ' {c} ')]" for c in cls.split())
+            self.all_xp[key] = etree.XPath(f"descendant::{tag}{cond}")
+            self.first_xp[key] = etree.XPath(f"(descendant::{tag}{cond})[1]")
+
+    def parse(self, text, only=None):
+        return lxml_html.document_fromstring(text)
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    match_elements = soup.find_all("a", class_="ejgS5 DuVhK ra0fi")
+    def find(self, node, key):
+        found = self.first_xp[key](node)
+        return found[0] if found else None
+
+    def find_all(self, node, key):
+        return self.all_xp[key](node)
+
+    def text(self, node):
+        return "".join(t.strip() for t in node.itertext() if t.strip())
+
+    def raw_text(self, node):
+        return "".join(node.itertext())
+
+    def attr(self, node, name):
+        return node.get(name)
+
+def html_backend(name=None):
+    name = name or HTML_PARSER
+    if name == "lxml" and HAVE_LXML:
+        return LxmlBackend()
+    return SoupBackend(strain=(name != "soup"))
+
+class ScrapeContext:
+    """Snapshot of the source pages for a single refresh.
+
+    Responses and parsed trees are memoized by URL, so fetch_ipl_data and
+    fetch_upcoming_matches can share them instead of re-downloading.
+    """
+    def __init__(self, concurrency=None, timeout=None, retries=None, cache=None, parser=None, metrics=None):
+        self.cache = cache
+        self.metrics = metrics or RefreshMetrics()
+        self.parser = parser or html_backend()
+        self.concurrency = concurrency or SCRAPE_CONCURRENCY
+        self.timeout = timeout or SCRAPE_TIMEOUT
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        retry = Retry(total=SCRAPE_RETRIES if retries is None else retries, backoff_factor=0.5,
+                      status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.responses = {}
+        self.documents = {}
+        self.memo = {}
+        self.entries = {}
+        self.unchanged = set()
+        self.dirty = set()
+        self.touched = set()
+        self.http_requests = 0
+        self.parse_passes = 0
+        self.not_modified = 0
+        self.parse_skips = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, url, headers):
+        with self._lock:
+            self.http_requests += 1
+        try:
+            if not self.cache:
+                return self._download(url, headers)
+            return self._fetch_cached(url, headers)
+        except Exception as e:
+            return e
+
+    def _download(self, url, headers):
+        t0 = time.perf_counter()
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        self.metrics.add_time("http", (time.perf_counter() - t0) * 1000)
+        self.metrics.count("bytes_fetched", len(resp.content))
+        return resp
+
+    def _fetch_cached(self, url, headers):
+        cached = self.cache.lookup(url)
+        cond = dict(headers or {})
+        if cached and cached.get("etag"):
+            cond["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            cond["If-Modified-Since"] = cached["last_modified"]
+        resp = self._download(url, cond)
+
+        if resp.status_code == 304 and cached:
+            with self._lock:
+                self.not_modified += 1
+                self.entries[url] = cached
+                self.unchanged.add(url)
+                self.touched.add(url)
+            resp = requests.Response()
+            resp.status_code, resp.url, resp.encoding = 200, url, "utf-8"
+            resp._content = cached["body"].encode("utf-8")
+            return resp
+        if resp.status_code != 200:
+            return resp
+
+        digest = hashlib.sha256(resp.content).hexdigest()
+        with self._lock:
+            if cached and cached["hash"] == digest:
+                self.entries[url] = cached
+                self.unchanged.add(url)
+            else:
+                self.entries[url] = {"url": url, "hash": digest, "body": resp.text, "parsed": {}}
+            self.entries[url]["etag"] = resp.headers.get("ETag")
+            self.entries[url]["last_modified"] = resp.headers.get("Last-Modified")
+            self.dirty.add(url)
+        return resp
+
+    def get(self, url, headers=None):
+        if url not in self.responses:
+            self.responses[url] = self._fetch(url, headers)
+        resp = self.responses[url]
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+    def prefetch(self, urls, headers=None):
+        """Download urls with bounded concurrency; results land in the memo in input order.
+
+        Failures are kept per URL and re-raised by get(), so callers see the
+        same errors they would from a serial loop.
+        """
+        todo = [u for u in dict.fromkeys(urls) if u not in self.responses]
+        if not todo:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(todo))) as pool:
+            for url, resp in zip(todo, pool.map(lambda u: self._fetch(u, headers), todo)):
+                self.responses[url] = resp
+
+    def document(self, url, headers=None, only=None):
+        """Parsed tree for url (restricted to `only` anchors if the backend supports it);
+        raises if the page did not come back 200."""
+        key = (url, only)
+        if key not in self.documents:
+            resp = self.get(url, headers)
+            if resp.status_code != 200:
+                raise Exception(f"Failed to retrieve page: Status code {resp.status_code}")
+            self.parse_passes += 1
+            with self.metrics.stage("parse"):
+                self.documents[key] = self.parser.parse(resp.text, only)
+        return self.documents[key]
+
+    def parsed(self, url, name, fn, headers=None, only=None, codec=None):
+        """fn(parser, root) for url, reusing the cached records when the page is unchanged.
+
+        codec is an (encode, decode) pair for records that are not plain JSON.
+        """
+        encode, decode = codec or (None, None)
+        key = (url, name)
+        if key not in self.memo:
+            self.get(url, headers)
+            entry = self.entries.get(url)
+            if url in self.unchanged and name in entry["parsed"]:
+                self.parse_skips += 1
+                stored = entry["parsed"][name]
+                self.memo[key] = decode(stored) if decode else stored
+            else:
+                root = self.document(url, headers, only)
+                with self.metrics.stage("extract"):
+                    self.memo[key] = fn(self.parser, root)
+                if entry is not None:
+                    entry["parsed"][name] = encode(self.memo[key]) if encode else self.memo[key]
+                    self.dirty.add(url)
+        return self.memo[key]
+
+    def flush(self):
+        """Write new or changed cache entries back, and evict old ones if anything was added."""
+        if not self.cache:
+            return
+        try:
+            stored = [self.entries[url] for url in self.dirty]
+            self.cache.save(stored, [self.entries[url] for url in self.touched - self.dirty])
+            self.dirty.clear()
+            self.touched.clear()
+            if stored:
+                self.cache.evict()
+        except Exception:
+            logging.exception("Failed to write page cache")
+
+    def stats(self):
+        return {
+            "http_requests": self.http_requests,
+            "not_modified": self.not_modified,
+            "parse_passes": self.parse_passes,
+            "parse_skips": self.parse_skips,
+        }
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Match records: parsed once into integers, turned into display rows at the edge
+# ──────────────────────────────────────────────────────────────────────────────
+@dataclass(slots=True)
+class Innings:
+    """One side of a result: canonical team, integer runs/wickets/legal balls, and the site's score text."""
+    team: str
+    runs: int
+    wickets: int
+    balls: int
+    text: str
+
+    @classmethod
+    def parse(cls, team, score, overs):
+        """From the site's "180/5" and "19.3 ov"; a score with no wickets means all out. Raises ValueError."""
+        runs, slash, wickets = score.strip().partition("/")
+        return cls(team, int(runs), int(wickets) if slash else 10, overs_to_balls(overs), f"{score} ({overs})")
+
+    @property
+    def nrr_balls(self):
+        """Balls counted for net run rate: all out counts as the full 20 overs."""
+        return 120 if self.wickets == 10 else self.balls
+
+@dataclass(slots=True)
+class MatchRecord:
+    """A completed match as parsed from the results page.
+
+    ts is the epoch of the site-local (IST) start time (see match_epoch). complete is
+    False when a score could not be read; such matches are listed but not
+    counted in the standings.
+    """
+    ts: int
+    date_time: str
+    venue: str
+    location: str
+    number: str
+    home: Innings
+    away: Innings
+    outcome: str
+    winner: str | None
+    complete: bool = True
+
+    @property
+    def id(self):
+        return match_id({"Date_Time": self.date_time, "Team_1": f"{self.home.team} - {self.home.text}",
+                         "Team_2": f"{self.away.team} - {self.away.text}"})
+
+    def row(self):
+        """The stored/API match shape."""
+        return {
+            "Date_Time": self.date_time,
+            "Venue": self.venue,
+            "Location": self.location,
+            "Match": self.number,
+            "Team_1": f"{self.home.team} - {self.home.text}",
+            "Team_2": f"{self.away.team} - {self.away.text}",
+            "Result": self.outcome,
+            "ts": self.ts,
+            "teams": [self.home.team, self.away.team],
+        }
+
+    def to_json(self):
+        """Compact list form for the page cache."""
+        return [self.ts, self.date_time, self.venue, self.location, self.number,
+                [self.home.team, self.home.runs, self.home.wickets, self.home.balls, self.home.text],
+                [self.away.team, self.away.runs, self.away.wickets, self.away.balls, self.away.text],
+                self.outcome, self.winner, self.complete]
+
+    @classmethod
+    def from_json(cls, v):
+        return cls(*v[:5], Innings(*v[5]), Innings(*v[6]), *v[7:])
+
+# parsed results are cached under a versioned name, so entries in an older record format are re-parsed
+RESULTS_PARSE_KEY = "results.v3"
+RESULTS_CODEC = (lambda rs: [r.to_json() for r in rs], lambda rows: [MatchRecord.from_json(r) for r in rows])
+
+def parse_results_page(px, root):
+    """Every completed match on the results page as MatchRecords (no date filtering)."""
+    match_elements = px.find_all(root, "result_anchor")
     matches = []
 
     for match in match_elements:
         try:
-            date_time_section = match.find("div", class_="ieLQJ")
-            date_time_text = date_time_section.find("div").get_text(strip=True) if date_time_section else ""
+            date_time_section = px.find(match, "date_section")
+            date_time_text = px.text(px.find(date_time_section, "div")) if date_time_section is not None else ""
             try:
-                match_date = date_parser.parse(date_time_text)
-                if match_date.tzinfo:
-                    match_date = match_date.replace(tzinfo=None)
-                if since and match_date <= since:
-                    continue
+                match_date = parse_match_date(date_time_text)
             except ValueError:
                 continue
 
-            venue_section = date_time_section.find("div", class_="y_Y0B") if date_time_section else None
-            venue = venue_section.get_text(strip=True) if venue_section else ""
-            location = venue_section.find("div", class_="otuuQ").find("p").find("span").get_text(strip=True) if venue_section else ""
-            match_number = match.find("div", class_="cONiu").get_text(strip=True) if match.find("div", class_="cONiu") else ""
-            teams_container = match.find("div", class_="C81t6")
-            if not teams_container:
+            venue_section = px.find(date_time_section, "venue") if date_time_section is not None else None
+            venue = px.text(venue_section) if venue_section is not None else ""
+            location = px.text(px.find(px.find(px.find(venue_section, "location"), "p"), "span")) if venue_section is not None else ""
+            number_elem = px.find(match, "match_number")
+            match_number = px.text(number_elem) if number_elem is not None else ""
+            teams_container = px.find(match, "teams")
+            if teams_container is None:
                 continue
-            team_sections = teams_container.find_all("div", class_="U5fiW")
+            team_sections = px.find_all(teams_container, "team")
             teams = []
             for team in team_sections:
-                team_name_elem = team.find("div", class_="WkFo7")
-                if not team_name_elem:
+                team_name_elem = px.find(team, "team_name")
+                if team_name_elem is None:
                     continue
-                team_name = get_full_team_name(team_name_elem.get_text(strip=True))
-                score_section = team.find("div", class_="hPK5L")
-                score = score_section.find("div", class_="n7m6x").get_text(strip=True) if score_section and score_section.find("div", class_="n7m6x") else "0"
-                overs = score_section.find("div", class_="WbVlv").get_text(strip=True) if score_section and score_section.find("div", class_="WbVlv") else "0.0 ov"
-                teams.append({"team": team_name, "score": score, "overs": overs})
+                team_name = get_full_team_name(px.text(team_name_elem))
+                score_section = px.find(team, "score_section")
+                score_elem = px.find(score_section, "score") if score_section is not None else None
+                overs_elem = px.find(score_section, "overs") if score_section is not None else None
+                score = px.text(score_elem) if score_elem is not None else "0"
+                overs = px.text(overs_elem) if overs_elem is not None else "0.0 ov"
+                teams.append((team_name, score, overs))
 
             if len(teams) != 2:
                 continue
 
-            outcome = match.find("div", class_="bmG9a").get_text(strip=True) if match.find("div", class_="bmG9a") else ""
-            matches.append({
-                "date_time": date_time_text,
-                "venue": venue,
-                "location": location,
-                "match_number": match_number,
-                "teams": teams,
-                "outcome": outcome
-            })
+            try:
+                innings, complete = [Innings.parse(*t) for t in teams], True
+            except ValueError:
+                innings, complete = [Innings(t[0], 0, 0, 0, f"{t[1]} ({t[2]})") for t in teams], False
+            outcome_elem = px.find(match, "outcome")
+            outcome = px.text(outcome_elem) if outcome_elem is not None else ""
+            matches.append(MatchRecord(
+                ts=site_epoch(match_date),
+                date_time=date_time_text,
+                venue=venue,
+                location=location,
+                number=match_number,
+                home=innings[0],
+                away=innings[1],
+                outcome=outcome,
+                winner=match_winner(outcome),
+                complete=complete,
+            ))
         except Exception:
             continue
 
-    # build standings
-    teams_stats = {}
-    def init_team(n):
-        if n not in teams_stats:
-            teams_stats[n] = {
+    return matches
+
+def fetch_results(ctx):
+    """MatchRecords for the whole season from the results page, or None if it could not be read."""
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+    try:
+        return ctx.parsed(RESULTS_URL, RESULTS_PARSE_KEY, parse_results_page, headers,
+                          only="result_anchor", codec=RESULTS_CODEC)
+    except Exception as e:
+        logging.error(f"Error fetching IPL results page: {e}")
+        return None
+
+def fetch_ipl_data(since=None, ctx=None):
+    ctx = ctx or ScrapeContext()
+    results = fetch_results(ctx)
+    if results is None:
+        return [], []
+
+    cutoff = site_epoch(since) if since else None
+    matches = [r for r in results if cutoff is None or r.ts > cutoff]
+
+    agg = ctx.memo.get("aggregates")
+    if agg is None:
+        agg = ctx.memo["aggregates"] = StandingsAggregates()
+    # standings always cover the whole season, whatever `since` filtered out of the list
+    season = current_season(results)
+    agg.start_season(season)
+    agg.ingest(r for r in results if season_of(r.ts) == season)
+    standings = agg.standings()
+
+    return standings, [r.row() for r in matches]
+
+def match_winner(outcome):
+    super_over = re.search(r"(.+?) tied with (.+?) \((.+?) win Super Over", outcome)
+    if super_over:
+        return get_full_team_name(super_over.group(3).strip())
+    return get_full_team_name(outcome.split("beat")[0].strip()) if "beat" in outcome else None
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Standings aggregates: per-team totals that only fold in unseen results
+# ──────────────────────────────────────────────────────────────────────────────
+FORM_LENGTH = 5
+
+class StandingsAggregates:
+    """Per-team season totals (runs and balls as exact integers, W/L/NR, recent form).
+
+    ingest() applies only match IDs it has not seen, in date order, so it is
+    idempotent and a refresh costs time proportional to the new results.
+    Totals belong to one season; start_season() clears them when it turns over.
+    The state round-trips through iplCache/aggregates via to_dict/from_dict.
+    """
+    def __init__(self, teams=None, applied=None, season=None):
+        self.teams = teams or {}
+        self.applied = set(applied or [])
+        self.season = season
+        self.changed = False
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d.get("teams"), d.get("applied"), d.get("season"))
+
+    def to_dict(self):
+        return {"season": self.season, "teams": self.teams, "applied": sorted(self.applied)}
+
+    def start_season(self, season):
+        """Drop totals carried over from another season."""
+        if season != self.season:
+            self.teams, self.applied, self.season = {}, set(), season
+            self.changed = True
+
+    def _team(self, name):
+        if name not in self.teams:
+            self.teams[name] = {
                 "matches": 0, "wins": 0, "losses": 0, "no_result": 0,
-                "runs_scored": 0, "overs_faced": 0.0,
-                "runs_conceded": 0, "overs_bowled": 0.0,
-                "recent_form": []
+                "runs_scored": 0, "balls_faced": 0,
+                "runs_conceded": 0, "balls_bowled": 0,
+                "form": []
             }
+        return self.teams[name]
 
-    for m in matches:
-        t1 = m["teams"][0]; t2 = m["teams"][1]
-        init_team(t1["team"]); init_team(t2["team"])
-        try:
-            r1, bo1, bl1 = process_innings(t1)
-            r2, bo2, bl2 = process_innings(t2)
-        except:
-            continue
+    def _form(self, s, r):
+        s["form"] = (s["form"] + [r])[-FORM_LENGTH:]
 
-        teams_stats[t1["team"]]["matches"] += 1
-        teams_stats[t1["team"]]["runs_scored"] += r1
-        teams_stats[t1["team"]]["overs_faced"] += bo1
-        teams_stats[t1["team"]]["runs_conceded"] += r2
-        teams_stats[t1["team"]]["overs_bowled"] += bl2
-
-        teams_stats[t2["team"]]["matches"] += 1
-        teams_stats[t2["team"]]["runs_scored"] += r2
-        teams_stats[t2["team"]]["overs_faced"] += bo2
-        teams_stats[t2["team"]]["runs_conceded"] += r1
-        teams_stats[t2["team"]]["overs_bowled"] += bl1
-
-        outcome = m["outcome"]
-        super_over = re.search(r"(.+?) tied with (.+?) \((.+?) win Super Over", outcome)
-        if super_over:
-            winner = get_full_team_name(super_over.group(3).strip())
-        else:
-            winner = get_full_team_name(outcome.split("beat")[0].strip()) if "beat" in outcome else None
-
-        if winner == t1["team"]:
-            teams_stats[t1["team"]]["wins"] += 1
-            teams_stats[t1["team"]]["recent_form"].append("W")
-            teams_stats[t2["team"]]["losses"] += 1
-            teams_stats[t2["team"]]["recent_form"].append("L")
-        elif winner == t2["team"]:
-            teams_stats[t2["team"]]["wins"] += 1
-            teams_stats[t2["team"]]["recent_form"].append("W")
-            teams_stats[t1["team"]]["losses"] += 1
-            teams_stats[t1["team"]]["recent_form"].append("L")
+    def ingest(self, records):
+        """Fold MatchRecords in; returns how many were new."""
+        new = [(r.ts, r.id, r) for r in records]
+        new = sorted((x for x in new if x[1] not in self.applied), key=lambda x: x[0])
+        for _, mid, r in new:
+            self.applied.add(mid)
+            self._apply(r)
+        self.changed |= bool(new)
+        return len(new)
+
+    def _apply(self, r):
+        t1, t2 = r.home, r.away
+        s1 = self._team(t1.team); s2 = self._team(t2.team)
+        if not r.complete:
+            return
+
+        s1["matches"] += 1
+        s1["runs_scored"] += t1.runs
+        s1["balls_faced"] += t1.nrr_balls
+        s1["runs_conceded"] += t2.runs
+        s1["balls_bowled"] += t2.nrr_balls
+
+        s2["matches"] += 1
+        s2["runs_scored"] += t2.runs
+        s2["balls_faced"] += t2.nrr_balls
+        s2["runs_conceded"] += t1.runs
+        s2["balls_bowled"] += t1.nrr_balls
+
+        winner = r.winner
+        if winner == t1.team:
+            s1["wins"] += 1; self._form(s1, "W")
+            s2["losses"] += 1; self._form(s2, "L")
+        elif winner == t2.team:
+            s2["wins"] += 1; self._form(s2, "W")
+            s1["losses"] += 1; self._form(s1, "L")
         else:
-            teams_stats[t1["team"]]["no_result"] += 1
-            teams_stats[t2["team"]]["no_result"] += 1
-            teams_stats[t1["team"]]["recent_form"].append("NR")
-            teams_stats[t2["team"]]["recent_form"].append("NR")
-
-    standings = []
-    for team, s in teams_stats.items():
-        nrr = 0.0
-        if s["overs_faced"] and s["overs_bowled"]:
-            nrr = (s["runs_scored"]/s["overs_faced"]) - (s["runs_conceded"]/s["overs_bowled"])
-        standings.append({
-            "POS": 0,
-            "TEAM": team,
-            "P": s["matches"],
-            "W": s["wins"],
-            "L": s["losses"],
-            "NR": s["no_result"],
-            "NRR": round(nrr,3),
-            "FOR": f"{s['runs_scored']}/{decimal_to_overs(s['overs_faced'])}",
-            "AGAINST": f"{s['runs_conceded']}/{decimal_to_overs(s['overs_bowled'])}",
-            "PTS": s["wins"]*2,
-            "RECENT_FORM": " ".join(s["recent_form"][-5:])
-        })
-
-    standings.sort(key=lambda x: (x["PTS"], x["NRR"]), reverse=True)
-    for i, row in enumerate(standings, start=1):
-        row["POS"] = i
-
-    matches_list = []
-    for m in matches:
-        matches_list.append({
-            "Date_Time": m["date_time"],
-            "Venue": m["venue"],
-            "Location": m["location"],
-            "Match": m["match_number"],
-            "Team_1": f"{m['teams'][0]['team']} - {m['teams'][0]['score']} ({m['teams'][0]['overs']})",
-            "Team_2": f"{m['teams'][1]['team']} - {m['teams'][1]['score']} ({m['teams'][1]['overs']})",
-            "Result": m["outcome"]
-        })
-
-    return standings, matches_list
-
-def compute_probabilities(upcoming_matches, standings, matches):
+            s1["no_result"] += 1; self._form(s1, "NR")
+            s2["no_result"] += 1; self._form(s2, "NR")
+
+    def standings(self):
+        standings = []
+        for team, s in self.teams.items():
+            nrr = 0.0
+            if s["balls_faced"] and s["balls_bowled"]:
+                nrr = (s["runs_scored"]*6/s["balls_faced"]) - (s["runs_conceded"]*6/s["balls_bowled"])
+            standings.append({
+                "POS": 0,
+                "TEAM": team,
+                "P": s["matches"],
+                "W": s["wins"],
+                "L": s["losses"],
+                "NR": s["no_result"],
+                "NRR": round(nrr,3),
+                "FOR": f"{s['runs_scored']}/{balls_to_overs(s['balls_faced'])}",
+                "AGAINST": f"{s['runs_conceded']}/{balls_to_overs(s['balls_bowled'])}",
+                "PTS": s["wins"]*2,
+                "RECENT_FORM": " ".join(s["form"])
+            })
+
+        standings.sort(key=lambda x: (x["PTS"], x["NRR"]), reverse=True)
+        for i, row in enumerate(standings, start=1):
+            row["POS"] = i
+        return standings
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Results archive: every ingested result across seasons, stored column-wise
+# ──────────────────────────────────────────────────────────────────────────────
+ARCHIVE_FIRST_SEASON = int(os.environ.get("ARCHIVE_FIRST_SEASON", "2008"))
+TEAM_IDS = {t: i for i, t in enumerate(canonical_teams)}
+
+def season_of(ts):
+    return datetime.fromtimestamp(ts, SITE_TZ).year
+
+def current_season(records):
+    """Season of the latest result, or None for an empty list."""
+    return season_of(max(r.ts for r in records)) if records else None
+
+class ResultsArchive:
+    """Append-only columns (id, season, ts, home, away, winner) over all seasons' results.
+
+    Teams are indices into canonical_teams and winner is -1 for no result.
+    Pair and per-season totals are rebuilt as small arrays on every append,
+    so the stats a fixture detail page carries are a couple of lookups.
+    The columns round-trip through iplCache/archive as a compressed .npz blob.
+    """
+    COLUMNS = (("id", "S32"), ("season", "i2"), ("ts", "i8"), ("home", "i1"), ("away", "i1"), ("winner", "i1"))
+
+    def __init__(self, columns=None):
+        self.cols = {k: np.asarray((columns or {}).get(k, ()), dtype=t) for k, t in self.COLUMNS}
+        self.ids = set(self.cols["id"].tolist())
+        self.changed = False
+        self._index()
+
+    @classmethod
+    def from_doc(cls, d):
+        with np.load(io.BytesIO(d["blob"])) as z:
+            return cls({k: z[k] for k, _ in cls.COLUMNS})
+
+    def to_doc(self):
+        buf = io.BytesIO()
+        np.savez_compressed(buf, **self.cols)
+        return {"blob": buf.getvalue(), "seasons": sorted(self.seasons), "count": len(self.ids)}
+
+    def append(self, records):
+        """Add MatchRecords not archived yet (both teams must resolve); returns how many were new."""
+        rows = []
+        for r in records:
+            mid = r.id.encode()
+            home, away = TEAM_IDS.get(r.home.team), TEAM_IDS.get(r.away.team)
+            if mid in self.ids or home is None or away is None:
+                continue
+            self.ids.add(mid)
+            rows.append((mid, season_of(r.ts), r.ts, home, away, TEAM_IDS.get(r.winner, -1)))
+        if rows:
+            for (k, t), values in zip(self.COLUMNS, zip(*rows)):
+                self.cols[k] = np.concatenate([self.cols[k], np.asarray(values, dtype=t)])
+            self.changed = True
+            self._index()
+        return len(rows)
+
+    def _index(self):
+        n, c = len(canonical_teams), self.cols
+        home, away, winner = (c[k].astype(int) for k in ("home", "away", "winner"))
+        won = winner >= 0
+        loser = np.where(winner == home, away, home)
+        self.seasons = set(np.unique(c["season"]).tolist())
+        self.played = np.zeros((n, n), dtype=int)
+        np.add.at(self.played, (home, away), 1)
+        self.played += self.played.T
+        self.wins = np.zeros((n, n), dtype=int)  # wins[a, b]: times a beat b
+        np.add.at(self.wins, (winner[won], loser[won]), 1)
+
+        self.base = min(self.seasons) if self.seasons else 0
+        rows = c["season"].astype(int) - self.base
+        self.team_played = np.zeros((len(self.seasons) and rows.max() + 1, n), dtype=int)
+        np.add.at(self.team_played, (rows, home), 1)
+        np.add.at(self.team_played, (rows, away), 1)
+        self.team_won = np.zeros_like(self.team_played)
+        np.add.at(self.team_won, (rows[won], winner[won]), 1)
+
+    def covers(self, t1, t2, season):
+        """True when both teams are known and every season from ARCHIVE_FIRST_SEASON on is archived."""
+        return (t1 in TEAM_IDS and t2 in TEAM_IDS
+                and all(s in self.seasons for s in range(ARCHIVE_FIRST_SEASON, season)))
+
+    def fixture_stats(self, t1, t2, season):
+        """head_to_head and last_year_performance for a fixture, shaped like parse_detail_page's."""
+        a, b = TEAM_IDS[t1], TEAM_IDS[t2]
+        h2h = {"played": int(self.played[a, b]), "team1_wins": int(self.wins[a, b]), "team2_wins": int(self.wins[b, a])}
+        perf = {}
+        s = season - 1 - self.base
+        if 0 <= s < len(self.team_played):
+            for t, i in ((t1, a), (t2, b)):
+                p, w = int(self.team_played[s, i]), int(self.team_won[s, i])
+                if p:
+                    perf[t] = {"played": p, "won": w, "win_pct": round(100*w/p, 2)}
+        return {"head_to_head": h2h, "last_year_performance": perf}
+
+def archive_ref():
+    return db.collection("iplCache").document("archive")
+
+def load_archive():
+    doc = archive_ref().get()
+    return ResultsArchive.from_doc(doc.to_dict()) if doc.exists else ResultsArchive()
+
+def build_archive(pages, archive=None):
+    """Bulk-load recorded results pages (HTML text, any season) into an archive."""
+    archive = archive or ResultsArchive()
+    px = html_backend()
+    for text in pages:
+        archive.append(parse_results_page(px, px.parse(text, "result_anchor")))
+    return archive
+
+PROBABILITY_WEIGHTS = {"h2h":0.4,"form":0.2,"nrr":0.1,"sos":0.1,"performance":0.2}
+
+def form_val(f):
+    pts=0
+    for i,r in enumerate(f.split()):
+        w=1 - (i*0.1)
+        pts += w if r=="W" else -w if r=="L" else 0
+    return pts/ max(len(f.split()),1)
+
+def results_graph(standings, records):
     G = nx.DiGraph()
     for t in standings:
         G.add_node(t["TEAM"])
-    for m in matches:
-        out = m["Result"]
-        t1 = get_full_team_name(m["Team_1"].split(" - ")[0])
-        t2 = get_full_team_name(m["Team_2"].split(" - ")[0])
-        if not out: continue
-        so = re.search(r"(.+?) tied with (.+?) \((.+?) win Super Over", out)
-        winner = get_full_team_name(so.group(3).strip()) if so else get_full_team_name(out.split("beat")[0].strip()) if "beat" in out else None
-        loser = t1 if winner==t2 else t2
+    for r in records:
+        winner = r.winner
+        loser = r.home.team if winner==r.away.team else r.away.team
         if winner and loser:
             G.add_edge(winner, loser, weight=1.0)
+    return G
 
-    for m in upcoming_matches:
-        t1 = get_full_team_name(m["Team_1"])
-        t2 = get_full_team_name(m["Team_2"])
-        # head-to-head
-        h2h = m.get("head_to_head", {"played":0,"team1_wins":0,"team2_wins":0})
-        if h2h["played"]>0:
-            h2h_score = (h2h["team1_wins"] - h2h["team2_wins"]) / h2h["played"]
-        else:
-            h2h_score = 0
-        # form & NRR
-        s1 = next((x for x in standings if x["TEAM"].lower()==t1.lower()),None)
-        s2 = next((x for x in standings if x["TEAM"].lower()==t2.lower()),None)
-        def form_val(f):
-            pts=0
-            for i,r in enumerate(f.split()):
-                w=1 - (i*0.1)
-                pts += w if r=="W" else -w if r=="L" else 0
-            return pts/ max(len(f.split()),1)
-        f_score = (form_val(s1["RECENT_FORM"]) - form_val(s2["RECENT_FORM"])) if s1 and s2 else 0
-        nrr_score = np.tanh((s1["NRR"] - s2["NRR"])/2) if s1 and s2 else 0
-        # strength of schedule
-        try:
-            d1 = set(nx.descendants(G,t1))|{t1}
-            d2 = set(nx.descendants(G,t2))|{t2}
-            if t2 in d1 and t1 not in d2:
-                sos=0.3
-            elif t1 in d2 and t2 not in d1:
-                sos=-0.3
-            else:
-                avg1 = sum(nx.shortest_path_length(G,t1,o,weight='weight') for o in d1 if o!=t1)/max(1,len(d1)-1)
-                avg2 = sum(nx.shortest_path_length(G,t2,o,weight='weight') for o in d2 if o!=t2)/max(1,len(d2)-1)
-                sos=(avg2-avg1)/max(1,avg1+avg2)
-        except:
-            sos=0
-        # last year performance
-        perf = m.get("last_year_performance",{})
-        p1,p2 = perf.get(t1,{"win_pct":50}), perf.get(t2,{"win_pct":50})
-        perf_score = (p1["win_pct"]-p2["win_pct"])/100
-
-        weights = {"h2h":0.4,"form":0.2,"nrr":0.1,"sos":0.1,"performance":0.2}
-        total = weights["h2h"]*h2h_score + weights["form"]*f_score + weights["nrr"]*nrr_score + weights["sos"]*sos + weights["performance"]*perf_score
-        prob1 = 1/(1+np.exp(-total*3))
-        prob1 = max(0.05, min(0.95, prob1))
+class ScheduleMatrix:
+    """All-pairs shortest paths over the results graph (winner -> loser edges).
+
+    Distances come from one Floyd-Warshall pass over the small team-by-team
+    array; a new result is folded in with a single O(n^2) relaxation instead
+    of a rebuild. Every fixture's strength-of-schedule term is read from it.
+    """
+    def __init__(self, G):
+        self.nodes = list(G.nodes)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.edges = set()
+        n = len(self.nodes)
+        self.dist = np.full((n, n), np.inf)
+        np.fill_diagonal(self.dist, 0.0)
+        for u, v, data in G.edges(data=True):
+            self.dist[self.index[u], self.index[v]] = min(self.dist[self.index[u], self.index[v]], data.get("weight", 1.0))
+            self.edges.add((u, v))
+        for k in range(n):
+            self.dist = np.minimum(self.dist, self.dist[:, k, None] + self.dist[None, k, :])
+        self._refresh_avg()
+
+    def _refresh_avg(self):
+        reach = np.isfinite(self.dist)
+        np.fill_diagonal(reach, False)
+        self.reach = np.isfinite(self.dist)
+        counts = reach.sum(axis=1)
+        self.avg = np.where(reach, self.dist, 0.0).sum(axis=1) / np.maximum(1, counts)
+
+    def _add_node(self, name):
+        self.index[name] = len(self.nodes)
+        self.nodes.append(name)
+        n = len(self.nodes)
+        dist = np.full((n, n), np.inf)
+        dist[:n-1, :n-1] = self.dist
+        dist[n-1, n-1] = 0.0
+        self.dist = dist
+
+    def add_result(self, winner, loser, weight=1.0):
+        """Fold one new winner -> loser edge into the distances."""
+        if (winner, loser) in self.edges:
+            return
+        for t in (winner, loser):
+            if t not in self.index:
+                self._add_node(t)
+        self.edges.add((winner, loser))
+        u, v = self.index[winner], self.index[loser]
+        self.dist = np.minimum(self.dist, self.dist[:, u, None] + weight + self.dist[None, v, :])
+        self._refresh_avg()
+
+    def sos(self, t1_names, t2_names):
+        """Strength-of-schedule term per fixture; 0 when either team is not in the graph."""
+        i1 = np.array([self.index.get(t, -1) for t in t1_names], dtype=int)
+        i2 = np.array([self.index.get(t, -1) for t in t2_names], dtype=int)
+        known = (i1 >= 0) & (i2 >= 0)
+        if not self.nodes:
+            return np.zeros(len(i1))
+        a, b = np.where(known, i1, 0), np.where(known, i2, 0)
+        r12, r21 = self.reach[a, b], self.reach[b, a]
+        avg1, avg2 = self.avg[a], self.avg[b]
+        both = (avg2-avg1)/np.maximum(1, avg1+avg2)
+        out = np.where(r12 & ~r21, 0.3, np.where(r21 & ~r12, -0.3, both))
+        return np.where(known, out, 0.0)
+
+_schedule_cache = {}
+
+def schedule_matrix(standings, records):
+    """ScheduleMatrix for these results, reusing the warm instance's matrix when only edges were added."""
+    G = results_graph(standings, records)
+    edges = set(G.edges)
+    cached = _schedule_cache.get("matrix")
+    if cached is not None and cached.edges <= edges and set(cached.nodes) <= set(G.nodes):
+        for t in G.nodes:
+            if t not in cached.index:
+                cached._add_node(t)
+        for u, v in edges - cached.edges:
+            cached.add_result(u, v)
+        cached._refresh_avg()
+        return cached
+    _schedule_cache["matrix"] = ScheduleMatrix(G)
+    return _schedule_cache["matrix"]
+
+class ProbabilityEngine:
+    """Batch fixture scoring over per-team feature arrays.
+
+    Teams are mapped to integer indices once; form and NRR live in arrays,
+    and every fixture is scored in a single vectorized pass.
+    """
+    def __init__(self, standings, schedule=None):
+        self.index = {}
+        for i, t in enumerate(standings):
+            self.index.setdefault(t["TEAM"].lower(), i)
+        self.form = np.array([form_val(t["RECENT_FORM"]) for t in standings], dtype=float)
+        self.nrr = np.array([t["NRR"] for t in standings], dtype=float)
+        self.schedule = schedule
+
+    def team_index(self, name):
+        return self.index.get(name.lower(), -1)
+
+    def score(self, i1, i2, h2h, sos, perf1, perf2):
+        """Team_1 win probability for each fixture; i1/i2 are team indices (-1 = unknown)."""
+        i1, i2 = np.asarray(i1), np.asarray(i2)
+        known = (i1 >= 0) & (i2 >= 0)
+        a, b = np.where(known, i1, 0), np.where(known, i2, 0)
+        f_score = np.where(known, self.form[a] - self.form[b], 0.0) if len(self.form) else np.zeros(len(i1))
+        nrr_score = np.where(known, np.tanh((self.nrr[a] - self.nrr[b])/2), 0.0) if len(self.nrr) else np.zeros(len(i1))
+        perf_score = (np.asarray(perf1, dtype=float) - np.asarray(perf2, dtype=float))/100
+
+        w = PROBABILITY_WEIGHTS
+        total = w["h2h"]*np.asarray(h2h, dtype=float) + w["form"]*f_score + w["nrr"]*nrr_score + w["sos"]*np.asarray(sos, dtype=float) + w["performance"]*perf_score
+        return np.clip(1/(1+np.exp(-total*3)), 0.05, 0.95)
+
+    def score_fixtures(self, fixtures):
+        n = len(fixtures)
+        i1, i2 = np.empty(n, dtype=int), np.empty(n, dtype=int)
+        h2h, perf1, perf2 = np.zeros(n), np.empty(n), np.empty(n)
+        t1s, t2s = [], []
+        for k, m in enumerate(fixtures):
+            t1 = get_full_team_name(m["Team_1"])
+            t2 = get_full_team_name(m["Team_2"])
+            i1[k], i2[k] = self.team_index(t1), self.team_index(t2)
+            t1s.append(t1); t2s.append(t2)
+            played = m.get("head_to_head", {"played":0,"team1_wins":0,"team2_wins":0})
+            if played["played"]>0:
+                h2h[k] = (played["team1_wins"] - played["team2_wins"]) / played["played"]
+            perf = m.get("last_year_performance",{})
+            perf1[k] = perf.get(t1,{"win_pct":50})["win_pct"]
+            perf2[k] = perf.get(t2,{"win_pct":50})["win_pct"]
+        sos = self.schedule.sos(t1s, t2s) if self.schedule is not None else np.zeros(n)
+        return self.score(i1, i2, h2h, sos, perf1, perf2)
+
+def compute_probabilities(upcoming_matches, standings, records, metrics=None):
+    """Adds Probability to each upcoming row; records are the season's MatchRecords."""
+    metrics = metrics or RefreshMetrics()
+    with metrics.stage("graph"):
+        schedule = schedule_matrix(standings, records)
+    with metrics.stage("model"):
+        probs = ProbabilityEngine(standings, schedule).score_fixtures(upcoming_matches)
+    for m, prob1 in zip(upcoming_matches, probs):
         m["Probability"] = {"Team_1": round(prob1*100,2), "Team_2": round((1-prob1)*100,2)}
 
     return upcoming_matches
 
-def fetch_upcoming_matches(since=None):
-    url = "https://timesofindia.indiatimes.com/sports/cricket/ipl/schedule"
-    headers = {"User-Agent": "Mozilla/5.0"}
-    resp = requests.get(url, headers=headers)
-    if resp.status_code!=200:
-        return []
-    soup = BeautifulSoup(resp.text, "html.parser")
-    elems = soup.find_all("a", class_=lambda x: x and all(c in x.split() for c in ["ejgS5","GsXWY"]))
-    upcoming = []
-
-    abbr = {"CSK":"csk","MI":"mi","RCB":"rcb","KKR":"kkr","SRH":"srh","DC":"dc","PBKS":"pbks","RR":"rr","GT":"gt","LSG":"lsg"}
+TEAM_ABBR_LOWER = {"CSK":"csk","MI":"mi","RCB":"rcb","KKR":"kkr","SRH":"srh","DC":"dc","PBKS":"pbks","RR":"rr","GT":"gt","LSG":"lsg"}
 
+def parse_schedule_page(px, root):
+    """Fixture list from the schedule page (no date filtering, no detail pages)."""
+    elems = px.find_all(root, "fixture_anchor")
+    fixtures = []
     for m in elems:
         try:
-            dt_sec = m.find("div",class_="ieLQJ")
-            dt = dt_sec.find("div").get_text(strip=True) if dt_sec else ""
-            md = date_parser.parse(dt).replace(tzinfo=None)
-            if since and md<=since: continue
+            dt_sec = px.find(m, "date_section")
+            dt = px.text(px.find(dt_sec, "div")) if dt_sec is not None else ""
+            md = parse_match_date(dt)
 
-            venue = dt_sec.find("div",class_="y_Y0B").find("div",class_="otuuQ").find("span").get_text(strip=True) if dt_sec else ""
-            num = m.find("div",class_="B2Exg").find("div",class_="cONiu").get_text(strip=True)
+            venue = px.text(px.find(px.find(px.find(dt_sec, "venue"), "location"), "span")) if dt_sec is not None else ""
+            header = px.find(m, "fixture_header")
+            num = px.text(px.find(header, "match_number"))
             teams = []
-            for t in m.find("div",class_="B2Exg").find("div",class_="C81t6").find_all("div",class_="U5fiW"):
-                n = t.find("div",class_="WkFo7").get_text(strip=True)
+            for t in px.find_all(px.find(header, "teams"), "team"):
+                n = px.text(px.find(t, "team_name"))
                 if n=="TBC": raise AttributeError
                 teams.append(n)
+        except Exception:
+            continue
+        fixtures.append({"dt": dt, "date": md.isoformat(), "venue": venue, "num": num, "teams": teams, "href": px.attr(m, "href")})
+    return fixtures
+
+def parse_detail_page(px, root, teams):
+    """Head-to-head and last-year stats from a fixture detail page."""
+    abbr = TEAM_ABBR_LOWER
+    h2h={"played":0,"team1_wins":0,"team2_wins":0}
+    last_perf={}
+    ss=px.find(root, "detail_root")
+    if ss is not None:
+        h2s=px.find(ss, "h2h")
+        if h2s is not None:
+            for item in px.find_all(h2s, "h2h_item"):
+                txt=px.text(item).lower()
+                val=int(re.search(r"\d+",txt).group())
+                if "played" in txt: h2h["played"]=val
+                elif abbr.get(teams[0],teams[0].lower()) in txt: h2h["team1_wins"]=val
+                elif abbr.get(teams[1],teams[1].lower()) in txt: h2h["team2_wins"]=val
+
+        perf_sec=px.find(ss, "perf")
+        if perf_sec is not None:
+            for row in px.find_all(perf_sec, "perf_row")[1:]:
+                tn=px.text(px.find(px.find(row, "perf_team"), "span"))
+                tn_full=get_full_team_name(tn)
+                stats=px.find(row, "perf_stats")
+                played, won, win_pct = px.find(stats, "played"), px.find(stats, "won"), px.find(stats, "win_pct")
+                p=int(px.raw_text(played)) if played is not None else 0
+                w=int(px.raw_text(won)) if won is not None else 0
+                pct=float(px.raw_text(win_pct).replace("%","")) if win_pct is not None else 50
+                last_perf[tn_full]={"played":p,"won":w,"win_pct":pct}
+    return {"head_to_head": h2h, "last_year_performance": last_perf}
+
+def fetch_upcoming_matches(since=None, ctx=None):
+    ctx = ctx or ScrapeContext()
+    headers = {"User-Agent": "Mozilla/5.0"}
+    resp = ctx.get(SCHEDULE_URL, headers)
+    if resp.status_code!=200:
+        return []
+    fixtures = [f for f in ctx.parsed(SCHEDULE_URL, "schedule", parse_schedule_page, headers, only="fixture_anchor")
+                if not since or datetime.fromisoformat(f["date"]) > since]
+
+    # fixtures whose history the archive fully holds skip their detail page
+    archive = ctx.memo.get("archive")
+    local = {}
+    if archive is not None:
+        archive.append(fetch_results(ctx) or [])
+        for f in fixtures:
+            names = [get_full_team_name(t) for t in f["teams"]]
+            season = datetime.fromisoformat(f["date"]).year
+            if len(names) == 2 and archive.covers(*names, season):
+                local[id(f)] = archive.fixture_stats(*names, season)
+    detail_urls = {id(f): f"{SOURCE_BASE}{f['href']}" for f in fixtures if f["href"] and id(f) not in local}
+    ctx.prefetch(detail_urls.values(), headers)
 
-            h2h={"played":0,"team1_wins":0,"team2_wins":0}
-            last_perf={}
-            href=m.get("href")
-            if href:
-                inner = requests.get(f"https://timesofindia.indiatimes.com{href}",headers=headers)
+    upcoming = []
+    for f in fixtures:
+        teams = f["teams"]
+        try:
+            stats = local.get(id(f)) or {"head_to_head": {"played":0,"team1_wins":0,"team2_wins":0}, "last_year_performance": {}}
+            inner_url = detail_urls.get(id(f))
+            if inner_url:
+                inner = ctx.get(inner_url,headers)
                 if inner.status_code==200:
-                    ss=BeautifulSoup(inner.text,"html.parser").find("div",class_="cQWcQ")
-                    if ss:
-                        h2s=ss.find("div",class_="tVu1k")
-                        if h2s:
-                            for item in h2s.find_all("div",class_="OAk24"):
-                                txt=item.get_text(strip=True).lower()
-                                val=int(re.search(r"\d+",txt).group())
-                                if "played" in txt: h2h["played"]=val
-                                elif abbr.get(teams[0],teams[0].lower()) in txt: h2h["team1_wins"]=val
-                                elif abbr.get(teams[1],teams[1].lower()) in txt: h2h["team2_wins"]=val
-
-                        perf_sec=ss.find("div",class_="t66hp")
-                        if perf_sec:
-                            for row in perf_sec.find_all("div",class_="U5ktS")[1:]:
-                                tn=row.find("div",class_="CCcyO").find("span").get_text(strip=True)
-                                tn_full=get_full_team_name(tn)
-                                stats=row.find("div",class_="vtQ9d")
-                                p=int(stats.find("strong",class_="_donp").text) if stats.find("strong",class_="_donp") else 0
-                                w=int(stats.find("strong",class_="PqVJY").text) if stats.find("strong",class_="PqVJY") else 0
-                                pct=float(stats.find("strong",class_="OngzT").text.replace("%","")) if stats.find("strong",class_="OngzT") else 50
-                                last_perf[tn_full]={"played":p,"won":w,"win_pct":pct}
+                    stats = ctx.parsed(inner_url, "detail:" + "|".join(teams),
+                                       lambda px, root: parse_detail_page(px, root, teams), headers, only="detail_root")
         except Exception:
             continue
 
         row={
-            "Date_Time": dt,
-            "Venue": venue,
-            "Location": venue,
-            "Match": num,
+            "Date_Time": f["dt"],
+            "Venue": f["venue"],
+            "Location": f["venue"],
+            "Match": f["num"],
             "Team_1": teams[0],
             "Team_2": teams[1],
             "Result": "",
-            "head_to_head": h2h,
-            "last_year_performance": last_perf
+            "head_to_head": dict(stats["head_to_head"]),
+            "last_year_performance": dict(stats["last_year_performance"])
         }
         upcoming.append(row)
 
-    # need full past for probabilities
-    past = fetch_ipl_data()[1]
-    return compute_probabilities(upcoming, fetch_ipl_data()[0], past)
+    # need full past for probabilities; the context hands back the already-parsed results page
+    standings, _ = fetch_ipl_data(ctx=ctx)
+    return compute_probabilities(upcoming, standings, fetch_results(ctx) or [], ctx.metrics)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Monte Carlo playoff odds
+# ──────────────────────────────────────────────────────────────────────────────
+SIM_MAX_RUNS = int(os.environ.get("SIM_MAX_RUNS", "200000"))
+SIM_BATCH = int(os.environ.get("SIM_BATCH", "10000"))
+SIM_TOLERANCE = float(os.environ.get("SIM_TOLERANCE", "0.002"))
+SIM_WORKERS = int(os.environ.get("SIM_WORKERS", "1"))  # one core covers a season in well under a second
+SIM_NRR_SIGMA = 1.0
+
+def _simulate_chunk(args):
+    """Simulate n seasons; returns (top4 counts, top2 counts, points sum) per team."""
+    seed, n, base_pts, base_nrr, played, p1, home, away = args
+    rng = np.random.default_rng(seed)
+    teams, fixtures = len(base_pts), len(p1)
+    # fixture -> team incidence, so a batch of seasons is two matmuls
+    inc1 = np.zeros((fixtures, teams)); inc1[np.arange(fixtures), home] = 1
+    inc2 = np.zeros((fixtures, teams)); inc2[np.arange(fixtures), away] = 1
+
+    t1_wins = rng.random((n, fixtures)) < p1
+    margin = np.abs(rng.normal(0.0, SIM_NRR_SIGMA, (n, fixtures)))
+    signed = np.where(t1_wins, margin, -margin)
+    wins = t1_wins @ inc1 + (~t1_wins) @ inc2
+    pts = base_pts + 2*wins
+    games = played + (inc1 + inc2).sum(axis=0)
+    nrr = (base_nrr*played + signed @ inc1 - signed @ inc2) / np.maximum(1, games)
+
+    # points first, NRR breaks ties (points are even, 0.5*tanh stays inside the gap)
+    key = pts + 0.5*np.tanh(nrr)
+    order = np.argsort(-key, axis=1)
+    top4 = np.bincount(order[:, :4].ravel(), minlength=teams)
+    top2 = np.bincount(order[:, :2].ravel(), minlength=teams)
+    return top4, top2, pts.sum(axis=0)
+
+def _sim_pool(workers):
+    """Process pool for the simulator, or None to run in-process.
+
+    Workers start from a forkserver (or spawn) rather than a fork of this
+    process, which holds gRPC channels and live threads.
+    """
+    if workers <= 1:
+        return None
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    try:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    except (OSError, ValueError, NotImplementedError):
+        return None
+
+def simulate_playoffs(standings, fixtures, max_runs=None, seed=None, workers=None, tol=None, batch=None):
+    """Chance of each team finishing top four, by simulating the rest of the season.
+
+    fixtures are upcoming rows carrying compute_probabilities' Probability.
+    Runs go out in rounds of `batch` seasons per worker and stop once the
+    largest standard error drops below tol, or at max_runs.
+    """
+    max_runs = max_runs or SIM_MAX_RUNS
+    tol = tol or SIM_TOLERANCE
+    batch = batch or SIM_BATCH
+    workers = workers or SIM_WORKERS
+    names = [t["TEAM"] for t in standings]
+    index = {n.lower(): i for i, n in enumerate(names)}
+    base_pts = np.array([t["PTS"] for t in standings], dtype=float)
+    base_nrr = np.array([t["NRR"] for t in standings], dtype=float)
+    played = np.array([t["P"] for t in standings], dtype=float)
+
+    home, away, p1 = [], [], []
+    for m in fixtures:
+        a = index.get(get_full_team_name(m["Team_1"]).lower())
+        b = index.get(get_full_team_name(m["Team_2"]).lower())
+        if a is None or b is None or a == b:
+            continue
+        home.append(a); away.append(b)
+        p1.append(m.get("Probability", {}).get("Team_1", 50)/100)
+    home, away, p1 = np.array(home, dtype=int), np.array(away, dtype=int), np.array(p1, dtype=float)
+
+    seeds = np.random.SeedSequence(seed)
+    top4 = np.zeros(len(names)); top2 = np.zeros(len(names)); pts = np.zeros(len(names))
+    runs, converged = 0, False
+    pool = _sim_pool(workers)
+    try:
+        while runs < max_runs and not converged:
+            n = min(batch, max(1, (max_runs - runs) // max(1, workers)))
+            jobs = [(child, n, base_pts, base_nrr, played, p1, home, away) for child in seeds.spawn(workers)]
+            results = pool.map(_simulate_chunk, jobs) if pool else map(_simulate_chunk, jobs)
+            for c4, c2, sp in results:
+                top4 += c4; top2 += c2; pts += sp
+                runs += n
+            p = top4 / runs
+            converged = bool(np.sqrt(p*(1-p)/runs).max() < tol)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    teams = [{
+        "TEAM": name,
+        "TOP4": round(float(100*top4[i]/max(1, runs)), 2),
+        "TOP2": round(float(100*top2[i]/max(1, runs)), 2),
+        "EXPECTED_PTS": round(float(pts[i]/max(1, runs)), 2),
+    } for i, name in enumerate(names)]
+    teams.sort(key=lambda t: (t["TOP4"], t["EXPECTED_PTS"]), reverse=True)
+    return {"teams": teams, "simulations": runs, "converged": converged, "seed": seed}
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Firestore persistence helpers
+# ──────────────────────────────────────────────────────────────────────────────
+FIRESTORE_BATCH_LIMIT = 500
+
+def match_id(m):
+    return hashlib.md5(f"{m['Date_Time']}_{m['Team_1']}_{m['Team_2']}".encode()).hexdigest()
+
+def diff_matches(new_past, new_upcoming, existing, now):
+    """Work out which match documents to write, in memory.
+
+    existing maps (collection_id, doc_id) to the stored document for every
+    candidate already in Firestore. Returns (past_sets, upcoming_sets,
+    upcoming_deletes): new results are added, fixtures that have started or
+    have a result move from upcoming to past, unseen fixtures are added to
+    upcoming, and any stored match whose scraped fields differ (probabilities,
+    head-to-head, venue, a corrected result) is written again.
+    """
+    def changed(coll, mid, m):
+        stored = existing.get((coll, mid))
+        return stored is None or any(stored.get(k) != v for k, v in m.items())
+
+    past_sets, up_sets, up_deletes = {}, {}, []
+    for m in new_past:
+        mid = match_id(m)
+        if changed("pastMatches", mid, m):
+            past_sets[mid] = m
+
+    for m in new_upcoming:
+        mid = match_id(m)
+        try:
+            d = parse_match_date(m["Date_Time"])
+        except Exception:
+            continue
+        if d < now or m.get("Result"):
+            if changed("pastMatches", mid, m):
+                past_sets[mid] = m
+            up_sets.pop(mid, None)
+            if ("upcomingMatches", mid) in existing:
+                up_deletes.append(mid)
+        elif changed("upcomingMatches", mid, m):
+            up_sets[mid] = m
+    return past_sets, up_sets, up_deletes
 
-def refresh_if_needed():
+def match_epoch(m):
+    """Seconds since epoch for a match's Date_Time (IST); 0 when it cannot be read."""
     try:
-        md_doc = db.collection("iplCache").document("metadata").get()
+        d = parse_match_date(m["Date_Time"])
+    except Exception:
+        return 0
+    return site_epoch(d)
+
+def match_teams(m):
+    """Canonical names of both sides, stored as an array so queries can filter by team."""
+    return [get_full_team_name(m["Team_1"].split(" - ")[0]), get_full_team_name(m["Team_2"].split(" - ")[0])]
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Materialized views: pre-sorted match lists, sharded under the 1 MiB doc limit
+# ──────────────────────────────────────────────────────────────────────────────
+VIEW_SHARD_BYTES = 900_000
+
+def view_ref(name, shard=0):
+    doc_id = name if shard == 0 else f"{name}-{shard}"
+    return db.collection("iplCache").document("views").collection("docs").document(doc_id)
+
+def view_ops(name, items):
+    """Set-ops that store items as view `name`: a head doc plus extra shards if needed."""
+    shards, cur, size = [], [], 0
+    for item in items:
+        n = len(json.dumps(item, default=str))
+        if cur and size + n > VIEW_SHARD_BYTES:
+            shards.append(cur)
+            cur, size = [], 0
+        cur.append(item)
+        size += n
+    shards.append(cur)
+    ops = [("set", view_ref(name), {"items": shards[0], "shards": len(shards), "count": len(items)})]
+    ops += [("set", view_ref(name, i), {"items": shard}) for i, shard in enumerate(shards[1:], start=1)]
+    return ops
+
+def read_view(name):
+    """Items of a materialized view in stored order, or None if it was never written."""
+    head = view_ref(name).get()
+    if not head.exists:
+        return None
+    head = head.to_dict()
+    items = list(head["items"])
+    if head.get("shards", 1) > 1:
+        rest = {d.id: d.to_dict() for d in db.get_all([view_ref(name, i) for i in range(1, head["shards"])])}
+        for i in range(1, head["shards"]):
+            items.extend(rest[f"{name}-{i}"]["items"])
+    return items
+
+def commit_in_batches(ops):
+    """Apply ("set", ref, data[, merge]) / ("delete", ref, None) ops in WriteBatches of <=500;
+    returns the number of writes."""
+    for i in range(0, len(ops), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for op in ops[i:i + FIRESTORE_BATCH_LIMIT]:
+            if op[0] == "delete":
+                batch.delete(op[1])
+            else:
+                batch.set(op[1], op[2], merge=len(op) > 3 and op[3])
+        batch.commit()
+    return len(ops)
+
+def check_aggregates(ctx):
+    """Rebuild the season's aggregates from the parsed results page and compare.
+
+    The daily forced refresh calls this; every other refresh trusts the
+    ingested aggregates. On a mismatch (a corrected scorecard, a result
+    ingested twice) the rebuilt copy replaces ctx.memo["aggregates"] and
+    True is returned.
+    """
+    results = fetch_results(ctx)
+    if not results:
+        return False
+    season = current_season(results)
+    rebuilt = StandingsAggregates(season=season)
+    rebuilt.ingest(r for r in results if season_of(r.ts) == season)
+    if rebuilt.teams == ctx.memo["aggregates"].teams:
+        return False
+    logging.warning("Standings aggregates drifted from a full rebuild; replacing them")
+    ctx.memo["aggregates"] = rebuilt
+    return True
+
+def refresh_if_needed(ctx=None):
+    ctx = ctx or ScrapeContext(cache=default_page_cache())
+    metrics = ctx.metrics
+    t0 = time.perf_counter()
+    fuzzy_before, unresolved_before = team_resolver.fuzzy_fallbacks, team_resolver.unresolved
+    try:
+        with metrics.stage("firestore"):
+            # one round trip; get_all does not promise to keep the order it was given
+            docs = {d.id: d for d in db.get_all([db.collection("iplCache").document(name)
+                                                 for name in ("metadata", "aggregates", "standings")])}
+            md_doc, agg_doc, standings_doc = docs["metadata"], docs["aggregates"], docs["standings"]
+            ctx.memo["archive"] = archive = load_archive()
+            metrics.count("firestore_reads", 4)
         md = md_doc.to_dict() if md_doc.exists else {}
         last_past = md.get("lastPastMatch", datetime(2000,1,1))
         last_future = md.get("lastFutureMatch", datetime(2000,1,1))
@@ -439,69 +1711,267 @@ def refresh_if_needed():
         if isinstance(last_upd, datetime) and last_upd.tzinfo: last_upd=last_upd.replace(tzinfo=None)
         force = (datetime.now() - last_upd) > timedelta(hours=24)
 
-        new_standings, new_past = fetch_ipl_data(since=None if force else last_past)
-        new_upcoming = fetch_upcoming_matches(since=None if force else last_future)
+        aggregates = StandingsAggregates.from_dict(agg_doc.to_dict()) if agg_doc.exists else StandingsAggregates()
+        stored_standings = standings_doc.to_dict().get("teams", []) if standings_doc.exists else []
+        ctx.memo["aggregates"] = aggregates
+
+        with metrics.stage("scrape"):
+            new_standings, new_past = fetch_ipl_data(since=None if force else last_past, ctx=ctx)
+            drifted = force and check_aggregates(ctx)
+            if drifted:
+                aggregates = ctx.memo["aggregates"]
+                new_standings = aggregates.standings()
+            # stored fixtures' probabilities depend on the table, so new results re-score all of them
+            new_upcoming = fetch_upcoming_matches(since=None if force or new_past else last_future, ctx=ctx)
+
+        with metrics.stage("page_cache"):
+            ctx.flush()
+        for k, v in ctx.stats().items():
+            metrics.count(k, v)
+        if ctx.cache:
+            metrics.count("page_cache_reads", ctx.cache.reads)
+            metrics.count("page_cache_writes", ctx.cache.writes)
+            if isinstance(ctx.cache.backend, FirestoreCacheBackend):
+                metrics.count("firestore_reads", ctx.cache.reads)
+                metrics.count("firestore_writes", ctx.cache.writes)
 
         def mx(lst,key):
             dates=[]
             for i in lst:
                 try:
-                    d=date_parser.parse(i[key])
-                    if d.tzinfo: d=d.replace(tzinfo=None)
-                    dates.append(d)
+                    dates.append(parse_match_date(i[key]))
                 except:
                     pass
             return max(dates) if dates else datetime(2000,1,1)
 
         npast=mx(new_past,"Date_Time")
         nup=mx(new_upcoming,"Date_Time")
+        for m in new_upcoming:
+            m["ts"] = match_epoch(m)
+            m["teams"] = match_teams(m)
 
-        upd=False
-        # past incremental
-        for m in new_past:
-            mid=hashlib.md5(f"{m['Date_Time']}_{m['Team_1']}_{m['Team_2']}".encode()).hexdigest()
-            if not db.collection("iplCache").document("matches").collection("pastMatches").document(mid).get().exists:
-                db.collection("iplCache").document("matches").collection("pastMatches").document(mid).set(m)
-                upd=True
+        matches_ref = db.collection("iplCache").document("matches")
+        past_coll = matches_ref.collection("pastMatches")
+        up_coll = matches_ref.collection("upcomingMatches")
 
-        for m in new_upcoming:
-            mid=hashlib.md5(f"{m['Date_Time']}_{m['Team_1']}_{m['Team_2']}".encode()).hexdigest()
-            try:
-                d=date_parser.parse(m["Date_Time"]).replace(tzinfo=None)
-                if d < datetime.now() or m.get("Result"):
-                    db.collection("iplCache").document("matches").collection("pastMatches").document(mid).set(m)
-                    db.collection("iplCache").document("matches").collection("upcomingMatches").document(mid).delete()
-                    upd=True
-                else:
-                    if not db.collection("iplCache").document("matches").collection("upcomingMatches").document(mid).get().exists:
-                        db.collection("iplCache").document("matches").collection("upcomingMatches").document(mid).set(m)
-                        upd=True
-            except:
-                pass
-
-        if (new_standings and upd) or force:
-            db.collection("iplCache").document("standings").set({"teams": new_standings})
-
-        if upd or force:
-            db.collection("iplCache").document("metadata").set({
-                "lastPastMatch": npast,
-                "lastFutureMatch": nup,
-                "lastUpdated": firestore.SERVER_TIMESTAMP
-            }, merge=True)
-
-        # return fresh data
-        past_cached=[d.to_dict() for d in db.collection("iplCache").document("matches").collection("pastMatches").stream()]
-        up_cached=[d.to_dict() for d in db.collection("iplCache").document("matches").collection("upcomingMatches").stream()]
-        # sort
-        past_cached.sort(key=lambda x: date_parser.parse(x["Date_Time"]), reverse=True)
-        up_cached.sort(key=lambda x: date_parser.parse(x["Date_Time"]))
-        standings_doc=db.collection("iplCache").document("standings").get()
-        teams=standings_doc.to_dict().get("teams",[]) if standings_doc.exists else []
+        with metrics.stage("firestore"):
+            # one bulk read of every candidate document (a fixture may already be stored as either)
+            refs = [past_coll.document(match_id(m)) for m in new_past]
+            refs += [c.document(match_id(m)) for m in new_upcoming for c in (up_coll, past_coll)]
+            existing = {(d.reference.parent.id, d.id): d.to_dict()
+                        for d in (db.get_all(refs) if refs else []) if d.exists}
+            metrics.count("firestore_reads", len(refs))
+
+            past_sets, up_sets, up_deletes = diff_matches(new_past, new_upcoming, existing,
+                                                           datetime.now(SITE_TZ).replace(tzinfo=None))
+            ops = [("set", past_coll.document(mid), m) for mid, m in past_sets.items()]
+            ops += [("set", up_coll.document(mid), m) for mid, m in up_sets.items()]
+            ops += [("delete", up_coll.document(mid), None) for mid in up_deletes]
+            upd = bool(ops)
+            metrics.count("matches_written", len(ops))
+            if aggregates.changed:
+                ops.append(("set", db.collection("iplCache").document("aggregates"), aggregates.to_dict()))
+            if archive.changed:
+                ops.append(("set", archive_ref(), archive.to_doc()))
+
+            # a drift repair or corrected scorecard changes the table without any new match document;
+            # lastUpdated still has to move, since the read caches and ETags are keyed on it
+            restanded = bool(new_standings) and new_standings != stored_standings
+            if restanded or force:
+                ops.append(("set", db.collection("iplCache").document("standings"), {"teams": new_standings}))
+                stored_standings = new_standings
+
+            if upd or restanded or force:
+                ops.append(("set", db.collection("iplCache").document("metadata"), {
+                    "lastPastMatch": npast,
+                    "lastFutureMatch": nup,
+                    "lastUpdated": firestore.SERVER_TIMESTAMP,
+                    "lastChecked": firestore.SERVER_TIMESTAMP,
+                    "failures": 0
+                }, True))
+            else:
+                # nothing new, but stale-while-revalidate should not try again right away
+                ops.append(("set", db.collection("iplCache").document("metadata"),
+                            {"lastChecked": firestore.SERVER_TIMESTAMP, "failures": 0}, True))
+
+            metrics.count("firestore_writes", commit_in_batches(ops))
+
+            # return fresh data, and materialize the pre-sorted views the read endpoints serve
+            # (documents written before ts/teams existed, or with ts on an older basis, are backfilled
+            # so queries can index them)
+            past_cached, up_cached, backfill = [], [], []
+            for coll, out in ((past_coll, past_cached), (up_coll, up_cached)):
+                for d in coll.stream():
+                    m = d.to_dict()
+                    if "teams" not in m or m.get("ts") != match_epoch(m):
+                        m["ts"], m["teams"] = match_epoch(m), m.get("teams") or match_teams(m)
+                        backfill.append(("set", coll.document(d.id), {"ts": m["ts"], "teams": m["teams"]}, True))
+                    out.append(m)
+            metrics.count("firestore_reads", len(past_cached) + len(up_cached))
+            past_cached.sort(key=lambda x: x["ts"], reverse=True)
+            up_cached.sort(key=lambda x: x["ts"])
+            if upd or force or backfill:
+                metrics.count("firestore_writes", commit_in_batches(
+                    backfill + view_ops("pastMatches", past_cached) + view_ops("upcomingMatches", up_cached)))
+        teams = stored_standings
+        if (upd or restanded or force) and teams:
+            with metrics.stage("simulation"):
+                odds = simulate_playoffs(teams, up_cached)
+            db.collection("iplCache").document("playoffOdds").set(odds)
+            metrics.count("firestore_writes")
+            metrics.count("simulations", odds["simulations"])
+            logging.info(f"Playoff simulation: {odds['simulations']} runs, converged={odds['converged']}")
         return teams, past_cached, up_cached
 
     except Exception as e:
+        metrics.status = "error"
         logging.exception("Error in refresh_if_needed")
         raise
+    finally:
+        metrics.add_time("total", (time.perf_counter() - t0) * 1000)
+        metrics.count("fuzzy_fallbacks", team_resolver.fuzzy_fallbacks - fuzzy_before)
+        metrics.count("unresolved_teams", team_resolver.unresolved - unresolved_before)
+        record_refresh_metrics(metrics)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Single-flight refresh: a Firestore lease, plus background refresh for stale reads
+# ──────────────────────────────────────────────────────────────────────────────
+# must match maxDuration for api/index.py in vercel.json; no request, lease or stream outlives it
+FUNCTION_MAX_SECONDS = float(os.environ.get("FUNCTION_MAX_SECONDS", "60"))
+# a holder is killed at the function limit, so its lease need not last longer
+REFRESH_LEASE_SECONDS = float(os.environ.get("REFRESH_LEASE_SECONDS", str(FUNCTION_MAX_SECONDS)))
+# callers that wait give up with time left to answer before the platform cuts them off
+REFRESH_WAIT_SECONDS = min(float(os.environ.get("REFRESH_WAIT_SECONDS", "30")), FUNCTION_MAX_SECONDS - 15)
+STALE_AFTER_HOURS = float(os.environ.get("STALE_AFTER_HOURS", "6"))  # 0 turns stale-while-revalidate off
+# after a failed refresh, stale reads wait this long before retrying, doubling per failure up to the max
+REFRESH_BACKOFF_SECONDS = float(os.environ.get("REFRESH_BACKOFF_SECONDS", "300"))
+REFRESH_BACKOFF_MAX_SECONDS = float(os.environ.get("REFRESH_BACKOFF_MAX_SECONDS", "21600"))
+
+class RefreshLease:
+    """Lease on iplCache/refreshLock (or another lock doc), so one refresh runs at a time across instances.
+
+    Taken and released in transactions; a holder that dies mid-run simply
+    lets it expire after ttl seconds.
+    """
+    def __init__(self, ttl=REFRESH_LEASE_SECONDS, lock="refreshLock"):
+        self.ttl = ttl
+        self.holder = uuid.uuid4().hex
+        self.ref = db.collection("iplCache").document(lock)
+
+    @staticmethod
+    def _held(snap):
+        d = snap.to_dict() if snap.exists else None
+        return d if d and d.get("expires", 0) > time.time() else None
+
+    def acquire(self):
+        @firestore.transactional
+        def take(txn):
+            held = self._held(self.ref.get(transaction=txn))
+            if held and held["holder"] != self.holder:
+                return False
+            txn.set(self.ref, {"holder": self.holder, "expires": time.time() + self.ttl})
+            return True
+        return take(db.transaction())
+
+    def release(self):
+        @firestore.transactional
+        def drop(txn):
+            held = self._held(self.ref.get(transaction=txn))
+            if held and held["holder"] == self.holder:
+                txn.delete(self.ref)
+        drop(db.transaction())
+
+    def wait(self, timeout=REFRESH_WAIT_SECONDS, poll=1.0):
+        """Block until nobody holds the lease; False if it was still held after timeout."""
+        deadline = time.time() + timeout
+        while self._held(self.ref.get()):
+            if time.time() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+def run_refresh(ctx=None, wait=True):
+    """refresh_if_needed under the lease.
+
+    Returns "ok" if this call ran it. Otherwise another refresh was in flight:
+    with wait the call blocks until that one finishes and returns "shared", so
+    callers reuse its result; "busy" means it was still running when the wait
+    ran out (or wait was False).
+    """
+    lease = RefreshLease()
+    if not lease.acquire():
+        return "shared" if wait and lease.wait() else "busy"
+    try:
+        refresh_if_needed(ctx)
+    except Exception:
+        record_failed_refresh()
+        raise
+    finally:
+        lease.release()
+    return "ok"
+
+def record_failed_refresh():
+    """Stamp lastAttempt and bump the failure count in metadata, so is_stale backs off.
+
+    Called with the lease held, so the read-then-write cannot race another refresh.
+    """
+    try:
+        ref = db.collection("iplCache").document("metadata")
+        md = ref.get().to_dict() or {}
+        ref.set({"lastAttempt": firestore.SERVER_TIMESTAMP,
+                 "failures": (md.get("failures") or 0) + 1}, merge=True)
+    except Exception:
+        logging.exception("Could not record the failed refresh")
+
+_background = {"thread": None}
+_background_lock = threading.Lock()
+
+def _background_refresh():
+    try:
+        run_refresh(wait=False)
+    except Exception:
+        logging.exception("Background refresh failed")
+    finally:
+        response_cache.invalidate()
+
+def refresh_in_background():
+    """Start a refresh on a daemon thread unless this instance already has one going.
+
+    On serverless hosts the thread only makes progress while the instance is
+    warm; the daily cron stays the backstop.
+    """
+    with _background_lock:
+        t = _background["thread"]
+        if t is not None and t.is_alive():
+            return False
+        _background["thread"] = threading.Thread(target=_background_refresh, daemon=True)
+        _background["thread"].start()
+        return True
+
+def _age(ts):
+    """Time since a metadata timestamp (naive values are UTC), or None if it is missing."""
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - ts
+
+def is_stale(md):
+    """True when metadata says nobody has refreshed within STALE_AFTER_HOURS.
+
+    Failed attempts count too: after n consecutive failures nothing is stale
+    until REFRESH_BACKOFF_SECONDS * 2**(n-1) (capped) have passed since the last one.
+    """
+    if not STALE_AFTER_HOURS:
+        return False
+    failures = md.get("failures") or 0
+    since_attempt = _age(md.get("lastAttempt"))
+    if failures and since_attempt is not None:
+        backoff = min(REFRESH_BACKOFF_SECONDS * 2 ** (failures - 1), REFRESH_BACKOFF_MAX_SECONDS)
+        if since_attempt < timedelta(seconds=backoff):
+            return False
+    age = _age(md.get("lastChecked") or md.get("lastUpdated"))
+    return age is None or age > timedelta(hours=STALE_AFTER_HOURS)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # New endpoint: full refresh
@@ -509,58 +1979,506 @@ def refresh_if_needed():
 @app.route("/api/refresh", methods=["GET"])
 def refresh():
     try:
-        # re‐scrape & push into Firestore
-        refresh_if_needed()
-
-        # now read back the metadata doc
-        md = db.collection("iplCache").document("metadata").get().to_dict() or {}
-        ts = md.get("lastUpdated")
-        # convert Firestore Timestamp -> ISO string
-        last_updated = ts.isoformat() if hasattr(ts, "isoformat") else None
-
-        return jsonify({
-            "status": "ok",
-            "lastUpdated": last_updated
-        }), 200
+        # re‐scrape & push into Firestore (?profile=1 adds a cProfile summary to the response)
+        ctx = ScrapeContext(cache=default_page_cache())
+        profiler = cProfile.Profile() if request.args.get("profile") == "1" else None
+        if profiler:
+            profiler.enable()
+        try:
+            status = run_refresh(ctx)
+        finally:
+            if profiler:
+                profiler.disable()
+
+        # now read back the metadata doc; this also re-keys the response cache
+        response_cache.invalidate()
+        last_updated = response_cache.version()
+
+        body = {
+            # "shared": another caller's refresh was in flight and this one waited for it;
+            # "busy": it was still running after REFRESH_WAIT_SECONDS
+            "status": status,
+            "lastUpdated": last_updated,
+            "scrape": ctx.stats(),
+            "metrics": ctx.metrics.to_dict(),
+            "teams": team_resolver.stats()
+        }
+        if profiler:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+            body["profile"] = out.getvalue()
+        if status == "busy":
+            return jsonify(body), 503, {"Retry-After": str(int(REFRESH_LEASE_SECONDS))}
+        return jsonify(body), 200
     except Exception as e:
         logging.exception("💥 Refresh failed")
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Recent refresh runs in Prometheus text format."""
+    doc = metrics_history_ref().get()
+    runs = doc.to_dict().get("runs", []) if doc.exists else []
+    resp = Response(prometheus_metrics(runs), status=200, mimetype="text/plain")
+    resp.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Response cache: serialized read bodies keyed on metadata.lastUpdated
+# ──────────────────────────────────────────────────────────────────────────────
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "30"))
+
+class ResponseCache:
+    """Warm-instance cache of JSON bodies for the read endpoints.
+
+    Every body is tagged with the lastUpdated value it was built from. That
+    value is re-read from iplCache/metadata at most once per ttl seconds, so
+    within the ttl a read costs no Firestore calls and after it just one.
+    If that read finds the data stale, the cached bodies are still served and
+    a background refresh is started (stale-while-revalidate).
+    """
+    MAX_BODIES = 256
+    MIN_COMPRESS_BYTES = 1024
+
+    def __init__(self, ttl=RESPONSE_CACHE_TTL):
+        self.ttl = ttl
+        self.bodies = {}
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def version(self):
+        with self._lock:
+            if time.time() - self._checked >= self.ttl:
+                md = db.collection("iplCache").document("metadata").get().to_dict() or {}
+                ts = md.get("lastUpdated")
+                # convert Firestore Timestamp -> ISO string
+                self._version = ts.isoformat() if hasattr(ts, "isoformat") else None
+                self._checked = time.time()
+                if is_stale(md):
+                    refresh_in_background()
+            return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._checked = 0.0
+
+    def respond(self, name, build, version_etag=False):
+        """Serve build()'s JSON for the current version, with ETag, 304 and compression.
+
+        With version_etag the ETag is derived from lastUpdated alone, so a
+        matching If-None-Match is answered without building the body at all.
+        """
+        version = self.version()
+        if version_etag:
+            etag = hashlib.sha1(f"{name}:{version}".encode()).hexdigest()
+            if request.if_none_match.contains(etag):
+                return self._finish(Response(status=304), etag)
+        hit = self.bodies.get(name)
+        if not hit or hit[0] != version:
+            body = app.json.dumps(build()).encode()
+            digest = etag if version_etag else hashlib.sha1(body).hexdigest()
+            hit = (version, body, digest, {})
+            if len(self.bodies) >= self.MAX_BODIES:
+                self.bodies.clear()
+            self.bodies[name] = hit
+        _, body, etag, encoded = hit
+        if request.if_none_match.contains(etag):
+            return self._finish(Response(status=304), etag)
+
+        encoding = self._encoding() if len(body) >= self.MIN_COMPRESS_BYTES else None
+        if encoding and encoding not in encoded:
+            encoded[encoding] = brotli.compress(body) if encoding == "br" else gzip.compress(body, 6)
+        resp = Response(encoded[encoding] if encoding else body, status=200, mimetype="application/json")
+        if encoding:
+            resp.headers["Content-Encoding"] = encoding
+        return self._finish(resp, etag)
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def _finish(self, resp, etag):
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = f"public, max-age=0, must-revalidate, s-maxage={int(self.ttl)}"
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+response_cache = ResponseCache()
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Fast read endpoints, no scraping on each call
 # ──────────────────────────────────────────────────────────────────────────────
 @app.route("/api/metadata", methods=["GET"])
 def metadata():
     """Tell client when we last ran our cron/refresh."""
-    md = db.collection("iplCache").document("metadata").get().to_dict() or {}
-    ts = md.get("lastUpdated")
-    last_updated = ts.isoformat() if hasattr(ts, "isoformat") else None
-    return jsonify({ "lastUpdated": last_updated }), 200
+    return response_cache.respond("metadata", lambda: {"lastUpdated": response_cache.version()})
 
-@app.route("/api/standings", methods=["GET"])
-def get_standings():
+def load_standings():
     doc = db.collection("iplCache").document("standings").get()
-    teams = doc.to_dict().get("teams", []) if doc.exists else []
-    return jsonify(teams), 200
+    return doc.to_dict().get("teams", []) if doc.exists else []
 
-@app.route("/api/matches", methods=["GET"])
-def get_matches():
+def load_past_matches():
+    view = read_view("pastMatches")
+    if view is not None:
+        return view
     past = [d.to_dict() for d in db.collection("iplCache")
                                  .document("matches")
                                  .collection("pastMatches")
                                  .stream()]
-    past.sort(key=lambda x: date_parser.parse(x["Date_Time"]), reverse=True)
-    return jsonify(past), 200
+    past.sort(key=lambda x: parse_match_date(x["Date_Time"]), reverse=True)
+    return past
 
-@app.route("/api/upcoming-matches", methods=["GET"])
-def get_upcoming_matches():
+def load_upcoming_matches():
+    view = read_view("upcomingMatches")
+    if view is not None:
+        return view
     up = [d.to_dict() for d in db.collection("iplCache")
                                .document("matches")
                                .collection("upcomingMatches")
                                .stream()]
-    up.sort(key=lambda x: date_parser.parse(x["Date_Time"]))
-    return jsonify(up), 200
+    up.sort(key=lambda x: parse_match_date(x["Date_Time"]))
+    return up
+
+@app.route("/api/standings", methods=["GET"])
+def get_standings():
+    return response_cache.respond("standings", load_standings)
+
+@app.route("/api/dashboard", methods=["GET"])
+def get_dashboard():
+    """Standings, past and upcoming matches and lastUpdated in one compressed response."""
+    def build():
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            standings = pool.submit(load_standings)
+            past = pool.submit(load_past_matches)
+            upcoming = pool.submit(load_upcoming_matches)
+            return {
+                "standings": standings.result(),
+                "matches": past.result(),
+                "upcomingMatches": upcoming.result(),
+                "lastUpdated": response_cache.version(),
+            }
+    return response_cache.respond("dashboard", build, version_etag=True)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Match queries: cursor pagination, filters and projection (see firestore.indexes.json)
+# ──────────────────────────────────────────────────────────────────────────────
+QUERY_PARAMS = ("limit", "cursor", "team", "venue", "from", "to", "fields")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def query_matches(collection, descending, args):
+    """One page of matches, filtered and ordered by ts inside Firestore.
+
+    team/venue/from/to become where clauses, fields becomes a select(), and
+    cursor is "<ts>:<doc id>" of the last item of the previous page; ties on
+    ts are broken by document ID, so matches sharing a ts are not skipped.
+    """
+    try:
+        limit = min(int(args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        cursor_ts, _, cursor_id = args.get("cursor", "").partition(":")
+        cursor_ts = int(cursor_ts) if cursor_ts else None
+    except ValueError:
+        raise ValueError("limit must be an integer and cursor a value from nextCursor")
+    try:
+        lo = site_epoch(parse_match_date(args["from"])) if args.get("from") else None
+        hi = site_epoch(parse_match_date(args["to"])) if args.get("to") else None
+    except ValueError:
+        raise ValueError("from and to must be dates, e.g. 2025-04-01")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    if hi is not None and len(args["to"]) == 10:
+        hi += 86399  # a bare date covers the whole day
+
+    q = db.collection("iplCache").document("matches").collection(collection)
+    if args.get("team"):
+        q = q.where(filter=firestore.FieldFilter("teams", "array_contains", get_full_team_name(args["team"])))
+    if args.get("venue"):
+        q = q.where(filter=firestore.FieldFilter("Venue", "==", args["venue"]))
+    if lo is not None:
+        q = q.where(filter=firestore.FieldFilter("ts", ">=", lo))
+    if hi is not None:
+        q = q.where(filter=firestore.FieldFilter("ts", "<=", hi))
+    direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+    q = q.order_by("ts", direction=direction).order_by("__name__", direction=direction)
+    if cursor_ts is not None:
+        q = q.start_after({"ts": cursor_ts, "__name__": cursor_id} if cursor_id else {"ts": cursor_ts})
+    fields = [f for f in args.get("fields", "").split(",") if f]
+    if fields:
+        q = q.select(list(dict.fromkeys(fields + ["ts"])))
+
+    docs = list(q.limit(limit).stream())
+    items = [d.to_dict() for d in docs]
+    next_cursor = f"{items[-1]['ts']}:{docs[-1].id}" if len(items) == limit else None
+    if fields and "ts" not in fields:
+        for m in items:
+            m.pop("ts", None)
+    return {"items": items, "nextCursor": next_cursor}
+
+def match_list_response(name, collection, descending):
+    """Whole pre-sorted view without parameters; a Firestore-backed page with them."""
+    if not any(k in request.args for k in QUERY_PARAMS):
+        return None
+    key = f"{name}?" + "&".join(f"{k}={request.args[k]}" for k in QUERY_PARAMS if k in request.args)
+    try:
+        return response_cache.respond(key, lambda: query_matches(collection, descending, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/api/playoff-odds", methods=["GET"])
+def get_playoff_odds():
+    """Top-four / top-two chances precomputed by the last refresh."""
+    def build():
+        doc = db.collection("iplCache").document("playoffOdds").get()
+        return doc.to_dict() if doc.exists else {"teams": [], "simulations": 0, "converged": False, "seed": None}
+    return response_cache.respond("playoff-odds", build)
+
+@app.route("/api/matches", methods=["GET"])
+def get_matches():
+    paged = match_list_response("matches", "pastMatches", descending=True)
+    if paged is not None:
+        return paged
+    return response_cache.respond("matches", load_past_matches)
+
+@app.route("/api/upcoming-matches", methods=["GET"])
+def get_upcoming_matches():
+    paged = match_list_response("upcoming-matches", "upcomingMatches", descending=False)
+    if paged is not None:
+        return paged
+    return response_cache.respond("upcoming-matches", load_upcoming_matches)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Live mode: poll the fixture in progress, write and stream only what changed
+# ──────────────────────────────────────────────────────────────────────────────
+# The live_* selectors have only been checked against synthetic pages, not a captured in-progress
+# fixture page, so live mode stays off unless LIVE_MODE=1.
+LIVE_MODE = os.environ.get("LIVE_MODE", "0") == "1"
+LIVE_POLL_SECONDS = float(os.environ.get("LIVE_POLL_SECONDS", "15"))
+LIVE_WINDOW_HOURS = float(os.environ.get("LIVE_WINDOW_HOURS", "5"))
+# streams end (and clients reconnect) before FUNCTION_MAX_SECONDS
+LIVE_STREAM_SECONDS = min(float(os.environ.get("LIVE_STREAM_SECONDS", "50")), FUNCTION_MAX_SECONDS - 10)
+LIVE_HEARTBEAT_SECONDS = 20
+LIVE_IDLE_RECHECK_SECONDS = 6 * 3600  # schedule re-read when it lists no future fixture
+def live_ref():
+    return db.collection("iplCache").document("live")
+
+def parse_live_page(px, root):
+    """Score line of a fixture page: Team_1/Team_2 in the stored "Team - score (overs)" form, plus Status."""
+    state = {}
+    teams = px.find(root, "live_teams")
+    for i, team in enumerate(px.find_all(teams, "live_team")[:2] if teams is not None else [], start=1):
+        name = px.find(team, "live_team_name")
+        section = px.find(team, "live_score_section")
+        score = px.find(section, "live_score") if section is not None else None
+        overs = px.find(section, "live_overs") if section is not None else None
+        if name is None:
+            continue
+        line = get_full_team_name(px.text(name))
+        if score is not None and px.text(score):
+            line += f" - {px.text(score)}" + (f" ({px.text(overs)})" if overs is not None else "")
+        state[f"Team_{i}"] = line
+    status = px.find(root, "live_status")
+    state["Status"] = px.text(status) if status is not None else ""
+    return state
+
+class LiveTracker:
+    """Follows the fixture in progress through iplCache/live, which every instance shares.
+
+    Scraping is single-flight across instances: a tick first takes a lease on
+    iplCache/liveLock that lasts one poll interval and is never released, so
+    however many instances have viewers the fixture page is fetched at most
+    once per interval. The poll diffs the page's score line against the stored
+    snapshot and merges only the changed fields into iplCache/live. Once a
+    result shows up it marks the fixture finished and hands over to a full
+    background refresh. Between fixtures the schedule is not read again until
+    the next scheduled start (nextCheck in the document).
+
+    Readers never scrape: /api/live returns the document, and one thread per
+    instance re-reads it every interval while anyone is subscribed and fans
+    the changed fields out to the streams.
+    """
+    HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+    def __init__(self, interval=LIVE_POLL_SECONDS):
+        self.interval = interval
+        self.seen = None  # current() as this instance's stream thread last read it
+        self.last_tick = 0.0
+        self.subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def read():
+        snap = live_ref().get()
+        return snap.to_dict() if snap.exists else {}
+
+    @staticmethod
+    def _in_window(doc):
+        now = datetime.now(SITE_TZ).replace(tzinfo=None)
+        return bool(doc.get("match")) and now - datetime.fromisoformat(doc["date"]) <= timedelta(hours=LIVE_WINDOW_HOURS)
+
+    @classmethod
+    def current(cls, doc):
+        """The {"match", "fields"} snapshot clients see (a finished fixture until its window closes), or None."""
+        return {"match": doc["match"], "fields": doc.get("fields", {})} if cls._in_window(doc) else None
+
+    def find_fixture(self, ctx, skip=None):
+        """(fixture, next_check): the latest scheduled fixture that started within the last
+        LIVE_WINDOW_HOURS (site time), or None if there is none or it is `skip`, and the
+        epoch of the next scheduled start, before which there is nothing to look for."""
+        now = datetime.now(SITE_TZ).replace(tzinfo=None)
+        window = timedelta(hours=LIVE_WINDOW_HOURS)
+        schedule = [(datetime.fromisoformat(f["date"]), f)
+                    for f in ctx.parsed(SCHEDULE_URL, "schedule", parse_schedule_page, self.HEADERS, only="fixture_anchor")
+                    if f["href"] and len(f["teams"]) == 2]
+        later = [d for d, _ in schedule if d > now]
+        next_check = site_epoch(min(later)) if later else time.time() + LIVE_IDLE_RECHECK_SECONDS
+        started = [(d, f) for d, f in schedule if timedelta(0) <= now - d <= window]
+        if not started:
+            return None, next_check
+        f = max(started, key=lambda x: x[0])[1]
+        fixture = {"match": match_id({"Date_Time": f["dt"], "Team_1": f["teams"][0], "Team_2": f["teams"][1]}),
+                   "Date_Time": f["dt"], "date": f["date"], "url": f"{SOURCE_BASE}{f['href']}"}
+        return (None if fixture["match"] == skip else fixture), next_check
+
+    def poll(self):
+        """One scrape against the stored snapshot; returns {"match", "fields"} with the changed fields, or None."""
+        doc = self.read()
+        fresh = not doc.get("match") or doc.get("finished") or not self._in_window(doc)
+        if fresh:
+            if time.time() < doc.get("nextCheck", 0):
+                return None
+            fixture, next_check = self.find_fixture(ScrapeContext(), skip=doc.get("match") if doc.get("finished") else None)
+            if fixture is None:
+                live_ref().set({"nextCheck": next_check}, merge=True)
+                return None
+            doc = dict(fixture, fields={}, nextCheck=next_check)
+        ctx = ScrapeContext()
+        state = parse_live_page(ctx.parser, ctx.document(doc["url"], self.HEADERS))
+        delta = {k: v for k, v in state.items() if doc["fields"].get(k) != v}
+        if not delta and not fresh:
+            return None
+        finished = bool(match_winner(state.get("Status", "")))
+        change = {"fields": delta, "finished": finished, "updated": firestore.SERVER_TIMESTAMP}
+        if fresh:
+            # a new fixture replaces the last one's document
+            live_ref().set(dict(doc, **change))
+        else:
+            live_ref().set(change, merge=True)
+        if finished:
+            # result is in: the full refresh moves the fixture to past matches and redoes standings
+            refresh_in_background()
+        return {"match": doc["match"], "fields": delta}
+
+    def tick(self):
+        """poll() unless this instance ticked within the interval or another instance already has."""
+        with self._lock:
+            if time.time() - self.last_tick < self.interval:
+                return None
+            self.last_tick = time.time()
+        if not RefreshLease(ttl=self.interval, lock="liveLock").acquire():
+            return None
+        return self.poll()
+
+    def changes(self, doc):
+        """What a subscriber needs after this read of iplCache/live: a delta event, or None."""
+        cur, prev = self.current(doc), self.seen
+        self.seen = cur
+        if cur is None:
+            return None
+        if prev is None or prev["match"] != cur["match"]:
+            return cur
+        delta = {k: v for k, v in cur["fields"].items() if prev["fields"].get(k) != v}
+        return {"match": cur["match"], "fields": delta} if delta else None
+
+    def subscribe(self):
+        q = queue.Queue()
+        with self._lock:
+            self.subscribers.add(q)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self.subscribers.discard(q)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self.subscribers:
+                    self._thread, self.seen = None, None
+                    return
+            try:
+                self.tick()
+                event = self.changes(self.read())
+            except Exception:
+                logging.exception("Live poll failed")
+                event = None
+            if event:
+                with self._lock:
+                    for q in self.subscribers:
+                        q.put(event)
+            time.sleep(self.interval)
+
+live_tracker = LiveTracker()
+
+@app.route("/api/live", methods=["GET"])
+def get_live():
+    """Current live snapshot from iplCache/live; also gives the shared poller its tick."""
+    if not LIVE_MODE:
+        return jsonify({"error": "Live mode is off"}), 404
+    try:
+        live_tracker.tick()
+    except Exception:
+        logging.exception("Live poll failed")
+    return jsonify(live_tracker.current(live_tracker.read()))
+
+@app.route("/api/live/stream", methods=["GET"])
+def live_stream():
+    """Server-Sent Events: a snapshot event, then a delta event per change, for LIVE_STREAM_SECONDS.
+
+    404 while live mode is off; EventSource does not reconnect after a non-200 response.
+    """
+    if not LIVE_MODE:
+        return jsonify({"error": "Live mode is off"}), 404
+    q = live_tracker.subscribe()
+    def events():
+        deadline = time.time() + LIVE_STREAM_SECONDS
+        try:
+            yield f"retry: 5000\nevent: snapshot\ndata: {json.dumps(live_tracker.current(live_tracker.read()))}\n\n"
+            while time.time() < deadline:
+                try:
+                    event = q.get(timeout=min(LIVE_HEARTBEAT_SECONDS, max(0.1, deadline - time.time())))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: delta\ndata: {json.dumps(event)}\n\n"
+        finally:
+            live_tracker.unsubscribe(q)
+    resp = Response(events(), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"
+    return resp
 
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    if sys.argv[1:2] == ["archive"]:
+        # python api/index.py archive results-2023.html results-2024.html ...
+        archive = load_archive()
+        before = len(archive.ids)
+        pages = []
+        for path in sys.argv[2:]:
+            with open(path, encoding="utf-8") as f:
+                pages.append(f.read())
+        build_archive(pages, archive)
+        archive_ref().set(archive.to_doc())
+        print(f"Archived {len(archive.ids) - before} new results; seasons {sorted(archive.seasons)}")
+    else:
+        app.run(debug=True, port=5001)
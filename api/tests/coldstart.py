@@ -0,0 +1,44 @@
+"""Cold start of one endpoint, in a fresh interpreter.
+
+    python coldstart.py <store.pickle> <path>
+
+Imports index, points it at a FakeFirestore loaded from the pickle and
+requests path once. Prints JSON: import_ms, ttfb_ms (until the first body
+chunk), status, and which of the heavy scraping/modeling modules ended up
+imported.
+"""
+import json
+import os
+import sys
+import time
+
+HEAVY = ("numpy", "networkx", "bs4", "lxml", "fuzzywuzzy", "dateutil", "firebase_admin", "google.cloud.firestore")
+
+def main(store_path, path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:0] = [os.path.dirname(here), here]
+    t0 = time.perf_counter()
+    import index
+    t1 = time.perf_counter()
+
+    import pickle
+    from fakes import FakeFirestore, firestore_module
+    fs = FakeFirestore()
+    with open(store_path, "rb") as f:
+        fs.store = pickle.load(f)
+    index.db, index.firestore = fs, firestore_module()
+
+    t2 = time.perf_counter()
+    resp = index.app.test_client().get(path, buffered=False)
+    next(iter(resp.response), b"")
+    t3 = time.perf_counter()
+    print(json.dumps({
+        "import_ms": round((t1 - t0) * 1000, 2),
+        "ttfb_ms": round((t3 - t2) * 1000, 2),
+        "status": resp.status_code,
+        "heavy": sorted(m for m in HEAVY if m in sys.modules),
+        "rpcs": fs.rpcs,
+    }))
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,91 @@
+"""Offline harness: the app against FakeFirestore and a StubSite on localhost.
+
+The stub server starts, and IPL_SOURCE_BASE points at it, before index is
+imported (the source URLs are fixed at import). Each test gets an empty
+FakeFirestore, an empty site and fresh per-instance caches.
+
+Benchmarks use pytest-benchmark; run them alone with
+
+    python -m pytest api/tests -k bench --benchmark-only
+
+Each records p50/p90/p99 and RPC counts in extra_info, asserts its RPC
+budget, and fails if its p50 exceeds BENCH_TOLERANCE (default 3) times the
+value stored in bench_baseline.json. BENCH_TOLERANCE=0 turns the timing
+check off; --benchmark-save/--benchmark-compare work as usual.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(__file__)
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from fakes import FakeFirestore, StubSite, firestore_module  # noqa: E402
+import sitegen  # noqa: E402
+
+SITE = StubSite()
+os.environ["IPL_SOURCE_BASE"] = SITE.base
+os.environ.setdefault("PAGE_CACHE", "off")
+os.environ.setdefault("STALE_AFTER_HOURS", "0")
+os.environ.setdefault("REFRESH_WAIT_SECONDS", "2")
+
+import index  # noqa: E402
+
+BENCH_TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "3"))
+with open(os.path.join(HERE, "bench_baseline.json")) as f:
+    BENCH_BASELINE = json.load(f)
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """index wired to a fresh FakeFirestore (as .fake_db) with fresh warm-instance state."""
+    fs = FakeFirestore()
+    monkeypatch.setattr(index, "db", fs)
+    monkeypatch.setattr(index, "firestore", firestore_module())
+    monkeypatch.setattr(index, "response_cache", index.ResponseCache())
+    monkeypatch.setattr(index, "live_tracker", index.LiveTracker())
+    monkeypatch.setattr(index, "_background", {"thread": None})
+    monkeypatch.setattr(index, "_schedule_cache", {})
+    monkeypatch.setattr(index, "fake_db", fs, raising=False)
+    return index
+
+@pytest.fixture
+def fake_db(app_module):
+    return app_module.fake_db
+
+@pytest.fixture
+def site():
+    SITE.reset()
+    return SITE
+
+@pytest.fixture
+def client(app_module):
+    with app_module.app.test_client() as c:
+        yield c
+
+def serve_season(site, **kw):
+    """Put a synthetic season on the stub site; returns (past, upcoming)."""
+    past, up = sitegen.season(**kw)
+    site.pages.update(sitegen.site(past, up))
+    return past, up
+
+def percentiles(benchmark):
+    """p50/p90/p99 in ms of the rounds pytest-benchmark ran, or None when benchmarks are disabled."""
+    stats = getattr(benchmark, "stats", None)
+    if not stats:
+        return None
+    data = sorted(stats.stats.data)
+    pick = lambda q: round(1000 * data[min(len(data) - 1, int(q * len(data)))], 3)
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99)}
+
+def check_regression(benchmark, case):
+    """Record percentiles and fail if p50 regressed past BENCH_TOLERANCE x the baseline."""
+    p = percentiles(benchmark)
+    if p is None:
+        return
+    benchmark.extra_info.update(p)
+    base = BENCH_BASELINE.get(case)
+    if BENCH_TOLERANCE and base:
+        assert p["p50"] <= base * BENCH_TOLERANCE, f"{case}: p50 {p['p50']} ms vs baseline {base} ms"
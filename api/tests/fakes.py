@@ -0,0 +1,328 @@
+"""In-memory stand-ins for Firestore and the Times of India site.
+
+FakeFirestore implements the slice of the google-cloud-firestore client the
+app uses (documents, collections, queries, batches, get_all, transactions)
+and counts every call that would be a round trip to the real service, plus
+the documents read and written, so tests can assert RPC budgets.
+
+StubSite is a threaded http.server on localhost serving a dict of path ->
+HTML with ETag / If-None-Match support, an optional per-request delay and
+scripted 503s; IPL_SOURCE_BASE points the app at it.
+"""
+import copy
+import hashlib
+import threading
+import time
+import types
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SERVER_TIMESTAMP = object()
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Firestore
+# ──────────────────────────────────────────────────────────────────────────────
+def _resolve(v):
+    """The value as Firestore would hand it back: server timestamps filled in, and
+    float subclasses such as numpy.float64 stored as plain doubles."""
+    if v is SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(v, dict):
+        return {k: _resolve(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_resolve(x) for x in v]
+    if isinstance(v, float) and type(v) is not float:
+        return float(v)
+    return v
+
+def _merge(into, d):
+    for k, v in d.items():
+        if isinstance(v, dict) and isinstance(into.get(k), dict):
+            _merge(into[k], v)
+        else:
+            into[k] = v
+
+class FieldFilter:
+    def __init__(self, field_path, op_string, value):
+        self.field_path, self.op_string, self.value = field_path, op_string, value
+
+class Snapshot:
+    def __init__(self, ref, data):
+        self.reference, self.id, self._data = ref, ref.id, data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+class DocumentRef:
+    def __init__(self, fs, path):
+        self.fs, self.path, self.id = fs, path, path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self):
+        return CollectionRef(self.fs, self.path.rsplit("/", 1)[0])
+
+    def collection(self, name):
+        return CollectionRef(self.fs, f"{self.path}/{name}")
+
+    def get(self, transaction=None, **kw):
+        self.fs.rpc("get", reads=1)
+        return Snapshot(self, copy.deepcopy(self.fs.store.get(self.path)))
+
+    def set(self, data, merge=False):
+        self.fs.rpc("set", writes=1)
+        self.fs.apply_set(self.path, data, merge)
+
+    def update(self, data):
+        self.fs.rpc("update", writes=1)
+        self.fs.apply_update(self.path, data)
+
+    def delete(self):
+        self.fs.rpc("delete", writes=1)
+        self.fs.store.pop(self.path, None)
+
+class Query:
+    def __init__(self, fs, path, filters=(), orders=(), limit=None, after=None, fields=None):
+        self.fs, self.path = fs, path
+        self.filters, self.orders = list(filters), list(orders)
+        self._limit, self._after, self._fields = limit, after, fields
+
+    def _copy(self, **kw):
+        q = Query(self.fs, self.path, self.filters, self.orders, self._limit, self._after, self._fields)
+        for k, v in kw.items():
+            setattr(q, k, v)
+        return q
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self.filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path, direction="ASCENDING"):
+        return self._copy(orders=self.orders + [(field_path, direction)])
+
+    def limit(self, n):
+        return self._copy(_limit=n)
+
+    def start_after(self, values):
+        return self._copy(_after=values)
+
+    def select(self, fields):
+        return self._copy(_fields=list(fields))
+
+    def _matches(self, doc):
+        for field, op, value in self.filters:
+            x = doc.get(field)
+            if op == "array_contains":
+                ok = value in (x or [])
+            elif x is None:
+                ok = False
+            else:
+                ok = {"==": x == value, ">=": x >= value, "<=": x <= value, ">": x > value, "<": x < value}[op]
+            if not ok:
+                return False
+        return True
+
+    def _results(self):
+        prefix = self.path + "/"
+        rows = [(p.rsplit("/", 1)[-1], p, d) for p, d in self.fs.store.items()
+                if p.startswith(prefix) and "/" not in p[len(prefix):] and self._matches(d)]
+        orders = self.orders or [("__name__", "ASCENDING")]
+        key_of = lambda row: tuple(row[0] if f == "__name__" else row[2].get(f) for f, _ in orders)
+        # every order in one query shares a direction here, which is all the app issues
+        descending = orders[0][1] == "DESCENDING"
+        rows.sort(key=key_of, reverse=descending)
+        if self._after is not None:
+            after = tuple(self._after.get(f) for f, _ in orders if f in self._after)
+            n = len(after)
+            rows = [r for r in rows if (key_of(r)[:n] < after if descending else key_of(r)[:n] > after)]
+        if self._limit:
+            rows = rows[:self._limit]
+        out = []
+        for _, path, d in rows:
+            d = copy.deepcopy(d)
+            if self._fields is not None:
+                d = {f: d[f] for f in self._fields if f in d}
+            out.append(Snapshot(DocumentRef(self.fs, path), d))
+        return out
+
+    def stream(self):
+        results = self._results()
+        self.fs.rpc("query", reads=max(1, len(results)))
+        return iter(results)
+
+    def get(self):
+        return list(self.stream())
+
+class CollectionRef(Query):
+    def __init__(self, fs, path):
+        super().__init__(fs, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, doc_id):
+        return DocumentRef(self.fs, f"{self.path}/{doc_id}")
+
+class WriteBatch:
+    def __init__(self, fs):
+        self.fs, self.ops = fs, []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append(lambda: self.fs.apply_set(ref.path, data, merge))
+
+    def update(self, ref, data):
+        self.ops.append(lambda: self.fs.apply_update(ref.path, data))
+
+    def delete(self, ref):
+        self.ops.append(lambda: self.fs.store.pop(ref.path, None))
+
+    def commit(self):
+        assert len(self.ops) <= 500, "a WriteBatch holds at most 500 writes"
+        self.fs.rpc("commit", writes=len(self.ops))
+        for op in self.ops:
+            op()
+
+class Transaction(WriteBatch):
+    pass
+
+class FakeFirestore:
+    """Client stand-in; store maps "coll/doc[/coll/doc...]" to plain dicts."""
+    def __init__(self):
+        self.store = {}
+        self.calls = Counter()
+        self.docs_read = 0
+        self.docs_written = 0
+
+    def rpc(self, kind, reads=0, writes=0):
+        self.calls[kind] += 1
+        self.docs_read += reads
+        self.docs_written += writes
+
+    @property
+    def rpcs(self):
+        return sum(self.calls.values())
+
+    def reset_counts(self):
+        self.calls.clear()
+        self.docs_read = self.docs_written = 0
+
+    def apply_set(self, path, data, merge):
+        data = copy.deepcopy(_resolve(data))
+        if merge and path in self.store:
+            _merge(self.store[path], data)
+        else:
+            self.store[path] = data
+
+    def apply_update(self, path, data):
+        if path not in self.store:
+            raise KeyError(f"No document to update: {path}")
+        self.store[path].update(copy.deepcopy(_resolve(data)))
+
+    def collection(self, name):
+        return CollectionRef(self, name)
+
+    def document(self, path):
+        return DocumentRef(self, path)
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self):
+        return Transaction(self)
+
+    def get_all(self, refs, field_paths=None):
+        refs = list(refs)
+        self.rpc("get_all", reads=len(refs))
+        return iter([Snapshot(r, copy.deepcopy(self.store.get(r.path))) for r in refs])
+
+def transactional(fn):
+    def run(txn, *args, **kw):
+        result = fn(txn, *args, **kw)
+        txn.commit()
+        return result
+    return run
+
+def firestore_module():
+    """Stand-in for firebase_admin.firestore, as far as the app uses it."""
+    return types.SimpleNamespace(
+        SERVER_TIMESTAMP=SERVER_TIMESTAMP,
+        FieldFilter=FieldFilter,
+        Query=types.SimpleNamespace(ASCENDING="ASCENDING", DESCENDING="DESCENDING"),
+        transactional=transactional,
+    )
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Site
+# ──────────────────────────────────────────────────────────────────────────────
+class StubSite:
+    """Serves pages[path] over HTTP on 127.0.0.1, with ETags and optional latency.
+
+    failures[path] = n answers the next n requests for path with 503.
+    """
+    def __init__(self):
+        self.pages = {}
+        self.failures = {}
+        self.latency = 0.0
+        self.hits = Counter()
+        self.not_modified = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site.hits[self.path] += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                if site.failures.get(self.path):
+                    site.failures[self.path] -= 1
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = site.pages.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                data = body.encode()
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    site.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def requests(self):
+        return sum(self.hits.values())
+
+    def reset(self, pages=None):
+        self.pages = dict(pages or {})
+        self.failures = {}
+        self.latency = 0.0
+        self.hits.clear()
+        self.not_modified = 0
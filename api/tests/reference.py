@@ -0,0 +1,73 @@
+"""Earlier implementations, kept only as oracles for parity tests and benchmarks."""
+import re
+
+import networkx as nx
+import numpy as np
+
+from index import get_full_team_name
+
+def compute_probabilities_scalar(upcoming_matches, standings, matches):
+    """compute_probabilities as it was before ProbabilityEngine: one fixture at a time.
+
+    matches are result rows (Team_1/Team_2/Result), not MatchRecords.
+    """
+    G = nx.DiGraph()
+    for t in standings:
+        G.add_node(t["TEAM"])
+    for m in matches:
+        out = m["Result"]
+        t1 = get_full_team_name(m["Team_1"].split(" - ")[0])
+        t2 = get_full_team_name(m["Team_2"].split(" - ")[0])
+        if not out: continue
+        so = re.search(r"(.+?) tied with (.+?) \((.+?) win Super Over", out)
+        winner = get_full_team_name(so.group(3).strip()) if so else get_full_team_name(out.split("beat")[0].strip()) if "beat" in out else None
+        loser = t1 if winner==t2 else t2
+        if winner and loser:
+            G.add_edge(winner, loser, weight=1.0)
+
+    for m in upcoming_matches:
+        t1 = get_full_team_name(m["Team_1"])
+        t2 = get_full_team_name(m["Team_2"])
+        # head-to-head
+        h2h = m.get("head_to_head", {"played":0,"team1_wins":0,"team2_wins":0})
+        if h2h["played"]>0:
+            h2h_score = (h2h["team1_wins"] - h2h["team2_wins"]) / h2h["played"]
+        else:
+            h2h_score = 0
+        # form & NRR
+        s1 = next((x for x in standings if x["TEAM"].lower()==t1.lower()),None)
+        s2 = next((x for x in standings if x["TEAM"].lower()==t2.lower()),None)
+        def form_val(f):
+            pts=0
+            for i,r in enumerate(f.split()):
+                w=1 - (i*0.1)
+                pts += w if r=="W" else -w if r=="L" else 0
+            return pts/ max(len(f.split()),1)
+        f_score = (form_val(s1["RECENT_FORM"]) - form_val(s2["RECENT_FORM"])) if s1 and s2 else 0
+        nrr_score = np.tanh((s1["NRR"] - s2["NRR"])/2) if s1 and s2 else 0
+        # strength of schedule
+        try:
+            d1 = set(nx.descendants(G,t1))|{t1}
+            d2 = set(nx.descendants(G,t2))|{t2}
+            if t2 in d1 and t1 not in d2:
+                sos=0.3
+            elif t1 in d2 and t2 not in d1:
+                sos=-0.3
+            else:
+                avg1 = sum(nx.shortest_path_length(G,t1,o,weight='weight') for o in d1 if o!=t1)/max(1,len(d1)-1)
+                avg2 = sum(nx.shortest_path_length(G,t2,o,weight='weight') for o in d2 if o!=t2)/max(1,len(d2)-1)
+                sos=(avg2-avg1)/max(1,avg1+avg2)
+        except:
+            sos=0
+        # last year performance
+        perf = m.get("last_year_performance",{})
+        p1,p2 = perf.get(t1,{"win_pct":50}), perf.get(t2,{"win_pct":50})
+        perf_score = (p1["win_pct"]-p2["win_pct"])/100
+
+        weights = {"h2h":0.4,"form":0.2,"nrr":0.1,"sos":0.1,"performance":0.2}
+        total = weights["h2h"]*h2h_score + weights["form"]*f_score + weights["nrr"]*nrr_score + weights["sos"]*sos + weights["performance"]*perf_score
+        prob1 = 1/(1+np.exp(-total*3))
+        prob1 = max(0.05, min(0.95, prob1))
+        m["Probability"] = {"Team_1": round(prob1*100,2), "Team_2": round((1-prob1)*100,2)}
+
+    return upcoming_matches
@@ -0,0 +1,125 @@
+"""Synthetic results, schedule, fixture and live pages in the site's markup.
+
+The pages carry exactly the classes EXTRACTION_SPEC selects on, wrapped in
+the same nesting the parsers walk. Seasons are seeded, so every run sees
+the same matches. `python api/tests/sitegen.py` rewrites the saved pages
+under fixtures/ that the parser tests and benchmarks load.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+
+TEAMS = [("Chennai Super Kings", "CSK"), ("Mumbai Indians", "MI"), ("Royal Challengers Bengaluru", "RCB"),
+         ("Kolkata Knight Riders", "KKR"), ("Sunrisers Hyderabad", "SRH"), ("Delhi Capitals", "DC"),
+         ("Punjab Kings", "PBKS"), ("Rajasthan Royals", "RR"), ("Gujarat Titans", "GT"),
+         ("Lucknow Super Giants", "LSG")]
+RESULTS_PATH = "/sports/cricket/ipl/results"
+SCHEDULE_PATH = "/sports/cricket/ipl/schedule"
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def site_time(d):
+    return d.strftime("%a, %d %b %Y, %I:%M %p") + " IST"
+
+def season(n_past=50, n_up=20, seed=1, start=None, up_start=None):
+    """(past, upcoming) match dicts. Results run two a day from start; fixtures one a day from up_start."""
+    rnd = random.Random(seed)
+    start = start or datetime(2025, 3, 22, 19, 30)
+    past, up = [], []
+    for i in range(n_past):
+        a, b = rnd.sample(TEAMS, 2)
+        d = start + timedelta(days=i // 2, hours=(i % 2) * -4)
+        r1, w1, r2, w2 = rnd.randint(120, 230), rnd.randint(2, 10), rnd.randint(100, 240), rnd.randint(2, 10)
+        o1 = "20" if w1 < 10 else f"{rnd.randint(14, 19)}.{rnd.randint(0, 5)}"
+        o2 = f"{rnd.randint(12, 19)}.{rnd.randint(0, 5)}" if r2 > r1 else "20"
+        k = rnd.random()
+        if k < 0.05:
+            outcome = "No result"
+        elif k < 0.1:
+            outcome = f"{a[0]} tied with {b[0]} ({a[1]} win Super Over)"
+        elif r2 > r1:
+            outcome = f"{b[0]} beat {a[0]} by {rnd.randint(1, 9)} wickets"
+        else:
+            outcome = f"{a[0]} beat {b[0]} by {r1 - r2 + 1} runs"
+        past.append({"d": d, "a": a, "b": b, "s1": f"{r1}/{w1}" if w1 < 10 else f"{r1}", "o1": o1,
+                     "s2": f"{r2}/{w2}", "o2": o2, "out": outcome, "num": f"Match {i + 1}"})
+    up_start = up_start or (datetime.now() + timedelta(days=3)).replace(hour=19, minute=30, second=0, microsecond=0)
+    for j in range(n_up):
+        a, b = rnd.sample(TEAMS, 2)
+        n = n_past + j + 1
+        up.append({"d": up_start + timedelta(days=j), "a": a, "b": b, "num": f"Match {n}",
+                   "href": f"/sports/cricket/ipl/live-cricket-score/{a[1].lower()}-vs-{b[1].lower()}/{n}",
+                   "played": rnd.randint(5, 30), "form": rnd.random()})
+    return past, up
+
+def _score_card(m, s1, o1, s2, o2, status):
+    def team(t, s, o):
+        score = f'<div class="hPK5L"><div class="n7m6x">{s}</div><div class="WbVlv">{o} ov</div></div>' if s else ""
+        return f'<div class="U5fiW"><div class="WkFo7">{t[1]}</div>{score}</div>'
+    return f'<div class="C81t6">{team(m["a"], s1, o1)}{team(m["b"], s2, o2)}</div><div class="bmG9a">{status}</div>'
+
+def results_html(past):
+    parts = ["<html><head><title>IPL Results</title></head><body><div class='page'>"]
+    for m in past:
+        parts.append(
+            f'<a class="ejgS5 DuVhK ra0fi" href="#"><div class="ieLQJ"><div>{site_time(m["d"])}</div>'
+            f'<div class="y_Y0B">Stadium<div class="otuuQ"><p><span>City</span></p></div></div></div>'
+            f'<div class="cONiu">{m["num"]}</div>'
+            + _score_card(m, m["s1"], m["o1"], m["s2"], m["o2"], m["out"]) + "</a>")
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+def schedule_html(up):
+    parts = ["<html><head><title>IPL Schedule</title></head><body><div class='page'>"]
+    for m in up:
+        parts.append(
+            f'<a class="ejgS5 GsXWY foo" href="{m["href"]}"><div class="ieLQJ"><div>{site_time(m["d"])}</div>'
+            f'<div class="y_Y0B"><div class="otuuQ"><span>Wankhede, Mumbai</span></div></div></div>'
+            f'<div class="B2Exg"><div class="cONiu">{m["num"]}</div><div class="C81t6">'
+            f'<div class="U5fiW"><div class="WkFo7">{m["a"][1]}</div></div>'
+            f'<div class="U5fiW"><div class="WkFo7">{m["b"][1]}</div></div></div></div></a>')
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+def detail_html(m):
+    p = m["played"]
+    w1 = int(p * m["form"])
+    won = int(14 * m["form"])
+    return (
+        f'<html><body><div class="cQWcQ"><div class="tVu1k"><div class="OAk24">Matches played {p}</div>'
+        f'<div class="OAk24">{m["a"][1]} won {w1}</div><div class="OAk24">{m["b"][1]} won {p - w1}</div></div>'
+        f'<div class="t66hp"><div class="U5ktS">Team</div>'
+        f'<div class="U5ktS"><div class="CCcyO"><span>{m["a"][1]}</span></div><div class="vtQ9d">'
+        f'<strong class="_donp">14</strong><strong class="PqVJY">{won}</strong>'
+        f'<strong class="OngzT">{round(100 * won / 14, 2)}%</strong></div></div>'
+        f'<div class="U5ktS"><div class="CCcyO"><span>{m["b"][1]}</span></div><div class="vtQ9d">'
+        f'<strong class="_donp">14</strong><strong class="PqVJY">7</strong><strong class="OngzT">50%</strong></div></div>'
+        f'</div></div></body></html>')
+
+def live_html(m, s1, o1, s2="", o2="", status="Innings 1"):
+    """A fixture page mid-match: the score card and status line."""
+    return f"<html><body>{_score_card(m, s1, o1, s2, o2, status)}</body></html>"
+
+def site(past, up):
+    """path -> HTML for a stub server: the results and schedule pages plus one page per fixture."""
+    pages = {RESULTS_PATH: results_html(past), SCHEDULE_PATH: schedule_html(up)}
+    for m in up:
+        pages[m["href"]] = detail_html(m)
+    return pages
+
+def seasons(years, per_season=74):
+    """Results pages for whole past seasons, e.g. to build a multi-season archive."""
+    return [results_html(season(n_past=per_season, n_up=0, seed=y, start=datetime(y, 3, 22, 19, 30))[0])
+            for y in years]
+
+def load(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+if __name__ == "__main__":
+    past, up = season(n_past=74, n_up=20, seed=2025, up_start=datetime(2025, 5, 20, 19, 30))
+    saved = {"results.html": results_html(past), "schedule.html": schedule_html(up), "detail.html": detail_html(up[0]),
+             "live.html": live_html(up[0], "187/4", "18.2", status="Innings 1")}
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, text in saved.items():
+        with open(os.path.join(FIXTURES_DIR, name), "w", encoding="utf-8") as f:
+            f.write(text)
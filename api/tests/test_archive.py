@@ -0,0 +1,99 @@
+"""ResultsArchive: head-to-head and last-year numbers against known results, and the detail-page fallback."""
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+import sitegen
+from conftest import serve_season
+
+MI, CSK, RCB = sitegen.TEAMS[1], sitegen.TEAMS[0], sitegen.TEAMS[2]
+
+def result(d, a, b, out, num):
+    return {"d": d, "a": a, "b": b, "s1": "180/5", "o1": "20", "s2": "170/8", "o2": "20", "out": out, "num": num}
+
+# 2024: MI beat CSK, CSK beat MI, MI beat RCB, MI v CSK no result; 2025: MI beat CSK
+KNOWN = [
+    result(datetime(2024, 4, 1, 19, 30), MI, CSK, "Mumbai Indians beat Chennai Super Kings by 10 runs", "Match 1"),
+    result(datetime(2024, 4, 8, 19, 30), CSK, MI, "Chennai Super Kings beat Mumbai Indians by 10 runs", "Match 2"),
+    result(datetime(2024, 4, 15, 19, 30), MI, RCB, "Mumbai Indians beat Royal Challengers Bengaluru by 10 runs",
+           "Match 3"),
+    result(datetime(2024, 4, 22, 19, 30), CSK, MI, "No result", "Match 4"),
+    result(datetime(2025, 4, 1, 19, 30), CSK, MI, "Mumbai Indians beat Chennai Super Kings by 2 wickets", "Match 1"),
+]
+
+def test_fixture_stats_on_known_results(app_module):
+    archive = app_module.build_archive([sitegen.results_html(KNOWN[:4]), sitegen.results_html(KNOWN[4:])])
+    assert archive.seasons == {2024, 2025} and len(archive.ids) == 5
+
+    stats = archive.fixture_stats("Mumbai Indians", "Chennai Super Kings", 2025)
+    assert stats["head_to_head"] == {"played": 4, "team1_wins": 2, "team2_wins": 1}
+    assert stats["last_year_performance"] == {
+        "Mumbai Indians": {"played": 4, "won": 2, "win_pct": 50.0},
+        "Chennai Super Kings": {"played": 3, "won": 1, "win_pct": 33.33},
+    }
+    # the other way round, and a season with no archived year before it
+    stats = archive.fixture_stats("Chennai Super Kings", "Mumbai Indians", 2024)
+    assert stats["head_to_head"] == {"played": 4, "team1_wins": 1, "team2_wins": 2}
+    assert stats["last_year_performance"] == {}
+
+def test_appending_the_same_results_again_changes_nothing(app_module):
+    archive = app_module.build_archive([sitegen.results_html(KNOWN)])
+    before = archive.fixture_stats("Mumbai Indians", "Royal Challengers Bengaluru", 2025)
+    assert app_module.build_archive([sitegen.results_html(KNOWN)], archive) is archive
+    assert len(archive.ids) == 5
+    assert archive.fixture_stats("Mumbai Indians", "Royal Challengers Bengaluru", 2025) == before
+
+def test_head_to_head_over_generated_seasons(app_module):
+    years = range(2021, 2025)
+    archive = app_module.build_archive(sitegen.seasons(years))
+    # tally the generator's own match dicts, not what the parser made of them
+    played, wins = Counter(), Counter()
+    for y in years:
+        past, _ = sitegen.season(n_past=74, n_up=0, seed=y, start=datetime(y, 3, 22, 19, 30))
+        for m in past:
+            a, b = m["a"][0], m["b"][0]
+            played[a, b] += 1
+            played[b, a] += 1
+            if " beat " in m["out"]:
+                wins[tuple(m["out"].split(" by ")[0].split(" beat "))] += 1
+            elif "Super Over" in m["out"]:
+                wins[a, b] += 1  # the side batting first wins the generator's super overs
+    for a, _ in sitegen.TEAMS:
+        for b, _ in sitegen.TEAMS:
+            if a != b:
+                assert archive.fixture_stats(a, b, 2025)["head_to_head"] == \
+                    {"played": played[a, b], "team1_wins": wins[a, b], "team2_wins": wins[b, a]}
+
+def test_roundtrip_through_the_stored_doc(app_module):
+    archive = app_module.build_archive([sitegen.results_html(KNOWN)])
+    again = app_module.ResultsArchive.from_doc(archive.to_doc())
+    assert again.ids == archive.ids
+    assert again.fixture_stats("Mumbai Indians", "Chennai Super Kings", 2025) == \
+        archive.fixture_stats("Mumbai Indians", "Chennai Super Kings", 2025)
+
+def test_covers_needs_every_season_since_the_first(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "ARCHIVE_FIRST_SEASON", 2024)
+    archive = app_module.build_archive([sitegen.results_html(KNOWN[:4])])
+    assert archive.covers("Mumbai Indians", "Chennai Super Kings", 2025)
+    assert not archive.covers("Mumbai Indians", "Chennai Super Kings", 2026)  # 2025 is missing
+    assert not archive.covers("Mumbai Indians", "Nowhere XI", 2025)
+
+@pytest.mark.parametrize("first, detail_pages", [(2015, False), (2014, True)])
+def test_fixtures_use_the_archive_only_when_it_covers_them(app_module, fake_db, site, monkeypatch,
+                                                          first, detail_pages):
+    _, up = serve_season(site, n_past=30, n_up=5)
+    monkeypatch.setattr(app_module, "ARCHIVE_FIRST_SEASON", first)
+    archive = app_module.build_archive(sitegen.seasons(range(2015, 2025)))
+    fake_db.store["iplCache/archive"] = archive.to_doc()
+
+    app_module.refresh_if_needed(app_module.ScrapeContext())
+    assert all((site.hits[m["href"]] == 1) == detail_pages for m in up)
+    stored = {d["Match"]: d for p, d in fake_db.store.items() if p.startswith("iplCache/matches/upcomingMatches/")}
+    for m in up:
+        if detail_pages:
+            assert stored[m["num"]]["head_to_head"]["played"] == m["played"]  # from the stub's detail page
+        else:
+            archive = app_module.load_archive()
+            expected = archive.fixture_stats(m["a"][0], m["b"][0], m["d"].year)
+            assert stored[m["num"]]["head_to_head"] == expected["head_to_head"]
@@ -0,0 +1,56 @@
+"""Cold starts: import time and time to first byte per read endpoint, each in a fresh process."""
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from conftest import check_regression, serve_season
+
+HERE = os.path.dirname(__file__)
+ENDPOINTS = ["/api/metadata", "/api/standings", "/api/matches", "/api/upcoming-matches",
+             "/api/playoff-odds", "/api/dashboard", "/api/matches?team=MI&limit=10"]
+
+@pytest.fixture(scope="module")
+def store_file(tmp_path_factory):
+    """A refreshed season's Firestore contents, pickled for the child processes."""
+    import index
+    from conftest import SITE
+    from fakes import FakeFirestore, firestore_module
+    saved = index.db, index.firestore
+    index.db, index.firestore = FakeFirestore(), firestore_module()
+    try:
+        SITE.reset()
+        serve_season(SITE, n_past=74, n_up=20)
+        index.refresh_if_needed(index.ScrapeContext())
+        path = tmp_path_factory.mktemp("coldstart") / "store.pickle"
+        with open(path, "wb") as f:
+            pickle.dump(index.db.store, f)
+    finally:
+        index.db, index.firestore = saved
+    return str(path)
+
+def cold_start(store_file, path):
+    env = dict(os.environ, FIREBASE_SA_KEY="{}")
+    out = subprocess.run([sys.executable, os.path.join(HERE, "coldstart.py"), store_file, path],
+                         capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_read_endpoints_stay_off_the_heavy_imports(store_file, path):
+    run = cold_start(store_file, path)
+    assert run["status"] == 200
+    # none of the scraping/modeling stack; dateutil is only a fallback for off-format dates
+    assert run["heavy"] == []
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_bench_cold_start(benchmark, store_file, path):
+    runs = []
+    benchmark.pedantic(lambda: runs.append(cold_start(store_file, path)), rounds=5)
+    benchmark.extra_info.update(
+        import_ms=sorted(r["import_ms"] for r in runs)[len(runs) // 2],
+        ttfb_ms=sorted(r["ttfb_ms"] for r in runs)[len(runs) // 2],
+        rpcs=runs[-1]["rpcs"])
+    check_regression(benchmark, f"cold_start[{path}]")
@@ -0,0 +1,52 @@
+"""parse_match_date against dateutil, and the full-season sort it speeds up."""
+import pytest
+from dateutil import parser as date_parser
+
+import sitegen
+from conftest import check_regression
+
+# dateutil does not know "IST" and says so; the comparisons drop the zone anyway
+pytestmark = pytest.mark.filterwarnings("ignore::dateutil.parser.UnknownTimezoneWarning")
+
+def season_rows(index):
+    """Every Date_Time on the saved results and schedule pages, as match rows."""
+    px = index.html_backend()
+    rows = [r.row() for r in index.parse_results_page(px, px.parse(sitegen.load("results.html"), "result_anchor"))]
+    rows += [{"Date_Time": f["dt"]} for f in index.parse_schedule_page(px, px.parse(sitegen.load("schedule.html")))]
+    return rows
+
+def test_fast_path_agrees_with_dateutil(app_module):
+    for m in season_rows(app_module):
+        assert app_module.parse_match_date(m["Date_Time"]) == date_parser.parse(m["Date_Time"]).replace(tzinfo=None)
+
+@pytest.mark.parametrize("text", ["2025-04-01", "1 Apr 2025 19:30", "Tue, 01 Apr 2025, 07:30 PM"])
+def test_other_formats_fall_back_to_dateutil(app_module, text):
+    assert app_module.parse_match_date(text) == date_parser.parse(text)
+
+def test_unreadable_date_raises_value_error(app_module):
+    with pytest.raises(ValueError):
+        app_module.parse_match_date("not a date")
+
+def test_ts_orders_like_the_date(app_module):
+    rows = season_rows(app_module)
+    by_date = sorted(rows, key=lambda m: app_module.parse_match_date(m["Date_Time"]))
+    assert sorted(rows, key=app_module.match_epoch) == by_date
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Benchmarks: sort one season's matches by date, as the refresh and read paths did
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("key", ["dateutil", "strptime_cold", "strptime_memo", "ts"])
+def test_bench_season_sort(benchmark, app_module, key):
+    rows = season_rows(app_module)
+    for m in rows:
+        m["ts"] = app_module.match_epoch(m)
+    parse = app_module.parse_match_date
+    keys = {
+        "dateutil": lambda m: date_parser.parse(m["Date_Time"]).replace(tzinfo=None),
+        "strptime_cold": lambda m: parse.__wrapped__(m["Date_Time"]),
+        "strptime_memo": lambda m: parse(m["Date_Time"]),
+        "ts": lambda m: m["ts"],
+    }
+    benchmark(sorted, rows, key=keys[key])
+    benchmark.extra_info.update(matches=len(rows))
+    check_regression(benchmark, f"season_sort[{key}]")
@@ -0,0 +1,76 @@
+"""Firestore round trips of the refresh: bulk existence reads and batched writes."""
+from datetime import datetime, timedelta, timezone
+
+from conftest import serve_season
+
+# cold refresh: one get_all for metadata, aggregates and standings and one for every candidate
+# match; archive and refreshHistory gets; one commit for the matches and one for the views; the
+# two match-collection streams; playoffOdds and refreshHistory sets
+COLD_REFRESH_CALLS = {"get": 2, "get_all": 2, "commit": 2, "query": 2, "set": 2}
+
+def refresh(index):
+    index.refresh_if_needed(index.ScrapeContext())
+
+def test_cold_refresh_rpcs_do_not_grow_with_matches(app_module, fake_db, site):
+    serve_season(site, n_past=74, n_up=20)
+    refresh(app_module)
+    assert dict(fake_db.calls) == COLD_REFRESH_CALLS
+    assert fake_db.rpcs == 10
+    # ...while writing every match document, which one-at-a-time calls made 100+ round trips
+    assert len([p for p in fake_db.store if p.startswith("iplCache/matches/")]) == 94
+
+def test_started_fixture_moves_in_one_commit(app_module, fake_db, site, monkeypatch):
+    past, up = serve_season(site, n_past=20, n_up=5)
+    refresh(app_module)
+    prefix = "iplCache/matches/upcomingMatches/"
+    moved = next(p[len(prefix):] for p, d in fake_db.store.items()
+                 if p.startswith(prefix) and d["Match"] == up[0]["num"])
+
+    # four days on, the first fixture (three days out) has started; the daily forced refresh moves it
+    diff = app_module.diff_matches
+    monkeypatch.setattr(app_module, "diff_matches", lambda p, u, e, now: diff(p, u, e, now + timedelta(days=4)))
+    fake_db.store["iplCache/metadata"]["lastUpdated"] = datetime.now(timezone.utc) - timedelta(days=2)
+    fake_db.reset_counts()
+    refresh(app_module)
+
+    assert f"iplCache/matches/upcomingMatches/{moved}" not in fake_db.store
+    assert f"iplCache/matches/pastMatches/{moved}" in fake_db.store
+    assert fake_db.calls["commit"] == 2 and fake_db.calls["get_all"] == 2
+    assert "delete" not in fake_db.calls
+
+def test_commit_in_batches_splits_at_500(app_module, fake_db):
+    coll = fake_db.collection("c")
+    ops = [("set", coll.document(str(i)), {"i": i}) for i in range(1201)]
+    ops += [("delete", coll.document("0"), None)]
+    assert app_module.commit_in_batches(ops) == 1202
+    assert fake_db.calls == {"commit": 3}
+    assert len(fake_db.store) == 1200
+
+def test_diff_matches_adds_moves_updates_and_skips_unchanged(app_module):
+    now = datetime(2025, 4, 10, 12, 0)
+    done = {"Date_Time": "Wed, 09 Apr 2025, 07:30 PM IST", "Team_1": "Mumbai Indians", "Team_2": "Punjab Kings"}
+    stored = {"Date_Time": "Tue, 08 Apr 2025, 07:30 PM IST", "Team_1": "Delhi Capitals", "Team_2": "Gujarat Titans"}
+    started = {"Date_Time": "Thu, 10 Apr 2025, 11:30 AM IST", "Team_1": "Rajasthan Royals",
+               "Team_2": "Chennai Super Kings"}
+    later = {"Date_Time": "Fri, 11 Apr 2025, 07:30 PM IST", "Team_1": "Lucknow Super Giants",
+             "Team_2": "Sunrisers Hyderabad"}
+    rescored = {"Date_Time": "Sat, 12 Apr 2025, 07:30 PM IST", "Team_1": "Kolkata Knight Riders",
+                "Team_2": "Royal Challengers Bengaluru", "Probability": {"Team_1": 60.0, "Team_2": 40.0}}
+    same = {"Date_Time": "Sun, 13 Apr 2025, 07:30 PM IST", "Team_1": "Mumbai Indians",
+            "Team_2": "Chennai Super Kings", "Probability": {"Team_1": 50.0, "Team_2": 50.0}}
+    mid = app_module.match_id
+    existing = {
+        ("pastMatches", mid(stored)): dict(stored, ts=1),  # fields the diff does not produce are ignored
+        ("upcomingMatches", mid(started)): started,
+        ("upcomingMatches", mid(rescored)): dict(rescored, Probability={"Team_1": 45.0, "Team_2": 55.0}),
+        ("upcomingMatches", mid(same)): same,
+    }
+    past_sets, up_sets, up_deletes = app_module.diff_matches([done, stored], [started, later, rescored, same],
+                                                             existing, now)
+    assert set(past_sets) == {mid(done), mid(started)}
+    assert set(up_sets) == {mid(later), mid(rescored)}
+    assert up_deletes == [mid(started)]
+
+    # once moved, the started fixture is neither written nor deleted again
+    existing = {("pastMatches", mid(started)): started}
+    assert app_module.diff_matches([], [started], existing, now) == ({}, {}, [])
@@ -0,0 +1,91 @@
+"""Live mode: score-line parsing, one poller across instances, polling only around fixtures, and the SSE stream."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import sitegen
+from conftest import serve_season
+
+@pytest.mark.parametrize("backend", ["lxml", "strainer", "soup"])
+def test_parse_live_page_on_saved_page(app_module, backend):
+    px = app_module.html_backend(backend)
+    state = app_module.parse_live_page(px, px.parse(sitegen.load("live.html")))
+    assert state["Status"] == "Innings 1"
+    assert state["Team_1"].endswith(" - 187/4 (18.2 ov)")
+    assert " - " not in state["Team_2"]  # yet to bat: name only
+
+def test_live_routes_404_while_live_mode_is_off(client):
+    assert client.get("/api/live").status_code == 404
+    assert client.get("/api/live/stream").status_code == 404
+
+def live_now(index, site, **scores):
+    """A season whose first fixture started an hour ago, its page showing scores (see sitegen.live_html)."""
+    now = datetime.now(index.SITE_TZ).replace(tzinfo=None, second=0, microsecond=0)
+    _, up = serve_season(site, n_past=5, n_up=2, up_start=now - timedelta(hours=1))
+    site.pages[up[0]["href"]] = sitegen.live_html(up[0], **scores)
+    return up[0]
+
+def test_idle_tracker_reads_schedule_once_until_next_start(app_module, fake_db, site, monkeypatch):
+    monkeypatch.setattr(app_module, "LIVE_MODE", True)
+    serve_season(site, n_past=5, n_up=3)
+    tracker = app_module.live_tracker
+    for _ in range(5):
+        tracker.last_tick = 0
+        fake_db.store.pop("iplCache/liveLock", None)
+        assert tracker.tick() is None
+    assert site.hits[sitegen.SCHEDULE_PATH] == 1
+    assert fake_db.store["iplCache/live"]["nextCheck"] > datetime.now().timestamp()
+
+def test_one_instance_polls_for_all(app_module, fake_db, site):
+    fixture = live_now(app_module, site, s1="45/1", o1="5.2")
+    instances = [app_module.LiveTracker() for _ in range(5)]
+    events = [t.tick() for t in instances]
+    assert site.hits[fixture["href"]] == 1
+    assert [e is not None for e in events] == [True, False, False, False, False]
+    assert all(t.current(t.read()) == t.current(instances[0].read()) for t in instances)
+
+    # the next interval's poller sees no change, so nothing is written
+    fake_db.store.pop("iplCache/liveLock")
+    instances[3].last_tick = 0
+    fake_db.reset_counts()
+    assert instances[3].tick() is None
+    assert site.hits[fixture["href"]] == 2
+    assert fake_db.calls["set"] == 0 and fake_db.docs_written == 1  # the lease only
+
+def test_poll_merges_the_changed_fields_and_hands_over_at_the_result(app_module, fake_db, site, monkeypatch):
+    fixture = live_now(app_module, site, s1="45/1", o1="5.2")
+    handed_over = []
+    monkeypatch.setattr(app_module, "refresh_in_background", lambda: handed_over.append(True))
+    tracker = app_module.live_tracker
+    tracker.poll()
+    site.pages[fixture["href"]] = sitegen.live_html(fixture, "45/1", "5.2", "46/1", "4.4",
+                                                   status=f"{fixture['b'][0]} beat {fixture['a'][0]} by 9 wickets")
+    event = tracker.poll()
+    assert set(event["fields"]) == {"Team_2", "Status"}
+    doc = fake_db.store["iplCache/live"]
+    assert doc["finished"] and doc["fields"]["Team_1"].endswith("45/1 (5.2 ov)") and handed_over == [True]
+
+    # the finished fixture is not polled again, and still shows until its window closes
+    assert tracker.poll() is None
+    assert site.hits[fixture["href"]] == 2
+    assert tracker.current(tracker.read())["fields"]["Status"].endswith("by 9 wickets")
+
+def test_live_endpoint_reads_the_shared_snapshot(app_module, client, fake_db, site, monkeypatch):
+    monkeypatch.setattr(app_module, "LIVE_MODE", True)
+    fixture = live_now(app_module, site, s1="45/1", o1="5.2")
+    app_module.LiveTracker().tick()  # another instance polled a moment ago
+    body = client.get("/api/live").get_json()
+    assert body["fields"]["Team_1"].endswith("45/1 (5.2 ov)")
+    assert site.hits[fixture["href"]] == 1
+
+def test_stream_sends_snapshot_then_deltas(app_module, client, site, monkeypatch):
+    monkeypatch.setattr(app_module, "LIVE_MODE", True)
+    monkeypatch.setattr(app_module, "LIVE_STREAM_SECONDS", 1.5)
+    monkeypatch.setattr(app_module.live_tracker, "interval", 0.1)
+    live_now(app_module, site, s1="45/1", o1="5.2")
+
+    body = b"".join(client.get("/api/live/stream").response).decode()
+    events = [e for e in body.split("\n\n") if e.startswith("retry") or e.startswith("event")]
+    assert "event: snapshot" in events[0] and "event: delta" in events[1]
+    assert "45/1 (5.2 ov)" in events[1]
+    assert app_module.fake_db.store["iplCache/live"]["fields"]["Status"] == "Innings 1"
@@ -0,0 +1,69 @@
+"""Refresh metrics: the Prometheus exposition and /api/metrics."""
+import pytest
+
+from conftest import serve_season
+
+def run(started, status="ok", **stages):
+    return {"started": started, "status": status, "stages": stages, "counters": {"http_requests": 6}}
+
+@pytest.fixture
+def resolver(app_module, monkeypatch):
+    r = app_module.TeamResolver(app_module.team_abbr_map, app_module.canonical_teams)
+    monkeypatch.setattr(app_module, "team_resolver", r)
+    return r
+
+def samples(text):
+    """The exposition's samples as {name{labels}: value}, skipping HELP/TYPE lines."""
+    out = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            out[key] = float(value)
+    return out
+
+def test_exposition_of_the_latest_run_and_averages(app_module, resolver):
+    resolver.resolve("MI")
+    resolver.resolve("Nowhere XI")
+    runs = [run("2025-04-01T10:00:00+00:00", scrape=100.0, store=20.0),
+            run("2025-04-01T11:00:00+00:00", "error", scrape=300.0),
+            run("2025-04-01T12:00:00+00:00", scrape=200.0, store=40.0)]
+    text = app_module.prometheus_metrics(runs)
+    assert text.endswith("\n")
+    assert "# TYPE ipl_refresh_stage_ms gauge" in text
+    assert samples(text) == {
+        "ipl_refresh_runs": 3,
+        "ipl_refresh_errors": 1,
+        "ipl_refresh_last_run_timestamp_seconds": 1743508800,
+        'ipl_refresh_stage_ms{stage="scrape"}': 200.0,
+        'ipl_refresh_stage_ms{stage="store"}': 40.0,
+        'ipl_refresh_events{name="http_requests"}': 6,
+        'ipl_refresh_stage_ms_avg{stage="scrape"}': 200.0,
+        'ipl_refresh_stage_ms_avg{stage="store"}': 30.0,
+        'ipl_team_resolver{name="hits"}': 1,
+        'ipl_team_resolver{name="misses"}': 1,
+        'ipl_team_resolver{name="fuzzy_fallbacks"}': 1,
+        'ipl_team_resolver{name="unresolved"}': 1,
+    }
+
+def test_label_values_are_escaped(app_module, resolver):
+    text = app_module.prometheus_metrics([run("2025-04-01T12:00:00+00:00", **{'a"b\\c': 1.0})])
+    assert 'ipl_refresh_stage_ms{stage="a\\"b\\\\c"} 1.0' in text.splitlines()
+
+def test_no_history_yet(app_module, resolver):
+    assert samples(app_module.prometheus_metrics([])) == {
+        "ipl_refresh_runs": 0, "ipl_refresh_errors": 0,
+        **{f'ipl_team_resolver{{name="{k}"}}': 0 for k in ("hits", "misses", "fuzzy_fallbacks", "unresolved")},
+    }
+
+def test_endpoint_serves_the_stored_history(client, fake_db, site, resolver):
+    resp = client.get("/api/metrics")
+    assert resp.status_code == 200 and samples(resp.get_data(as_text=True))["ipl_refresh_runs"] == 0
+
+    serve_season(site, n_past=10, n_up=4)
+    client.get("/api/refresh")
+    resp = client.get("/api/metrics")
+    assert resp.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+    assert resp.headers["Cache-Control"] == "no-store"
+    got = samples(resp.get_data(as_text=True))
+    assert got["ipl_refresh_runs"] == 1 and got["ipl_refresh_errors"] == 0
+    assert got['ipl_refresh_events{name="http_requests"}'] == 2 + 4
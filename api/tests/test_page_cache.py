@@ -0,0 +1,85 @@
+"""Page cache: conditional requests, parse skips, expiry, eviction and batched Firestore writes."""
+import time
+
+import pytest
+
+from conftest import serve_season
+
+@pytest.fixture
+def disk_cache(app_module, tmp_path):
+    def make(**kw):
+        return app_module.PageCache(app_module.DiskCacheBackend(str(tmp_path)), **kw)
+    return make
+
+def scrape(index, cache):
+    """fetch_results through a fresh context, flushed; returns the context."""
+    ctx = index.ScrapeContext(cache=cache)
+    assert index.fetch_results(ctx)
+    ctx.flush()
+    return ctx
+
+def test_not_modified_page_reuses_stored_records(app_module, site, disk_cache):
+    serve_season(site, n_past=20, n_up=0)
+    cache = disk_cache()
+    first = scrape(app_module, cache)
+    assert first.stats()["parse_passes"] == 1 and site.not_modified == 0
+
+    key = cache.key(app_module.RESULTS_URL)
+    cache.backend.touch(key, time.time() - 1800)
+    again = scrape(app_module, cache)
+    assert site.not_modified == 1
+    assert cache.backend.get(key)["stored_at"] > time.time() - 60  # revalidating keeps it from expiring
+    assert again.stats() == {"http_requests": 1, "not_modified": 1, "parse_passes": 0, "parse_skips": 1}
+    assert app_module.fetch_results(again) == app_module.fetch_results(first)
+
+def test_byte_identical_page_skips_the_parse(app_module, site, disk_cache):
+    serve_season(site, n_past=20, n_up=0)
+    cache = disk_cache()
+    scrape(app_module, cache)
+    key = cache.key(app_module.RESULTS_URL)
+    entry = cache.backend.get(key)
+    entry["etag"] = None  # a server without validators: the body comes back in full
+    cache.backend.put(key, entry)
+
+    ctx = scrape(app_module, cache)
+    assert site.not_modified == 0
+    assert ctx.stats()["parse_passes"] == 0 and ctx.stats()["parse_skips"] == 1
+
+def test_expired_entry_is_fetched_and_parsed_again(app_module, site, disk_cache):
+    serve_season(site, n_past=20, n_up=0)
+    cache = disk_cache(ttl=3600)
+    scrape(app_module, cache)
+    cache.backend.touch(cache.key(app_module.RESULTS_URL), time.time() - 7200)
+
+    ctx = scrape(app_module, cache)
+    assert site.not_modified == 0  # no If-None-Match was sent
+    assert ctx.stats()["parse_passes"] == 1
+
+def test_eviction_drops_expired_then_oldest_entries(app_module, disk_cache):
+    cache = disk_cache(ttl=3600, max_bytes=0)
+    now = time.time()
+    for i, age in enumerate([10, 20, 30, 7200]):
+        cache.backend.put(f"k{i}", {"url": f"u{i}", "body": "x" * 100})
+        cache.backend.touch(f"k{i}", now - age)
+    size = next(s for k, _, s in cache.backend.entries() if k == "k0")
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert sorted(k for k, _, _ in cache.backend.entries()) == ["k0", "k1"]
+
+def test_firestore_backend_writes_in_one_commit(app_module, fake_db, site):
+    serve_season(site, n_past=20, n_up=10)
+    cache = app_module.PageCache(app_module.FirestoreCacheBackend(fake_db))
+    ctx = app_module.ScrapeContext(cache=cache)
+    app_module.fetch_upcoming_matches(ctx=ctx)
+    fake_db.reset_counts()
+    ctx.flush()
+    assert dict(fake_db.calls) == {"commit": 1, "query": 1}  # the stores, then the eviction scan
+    assert fake_db.docs_written == 2 + 10
+
+    # every page revalidates: one commit of stored_at bumps, and no eviction scan
+    ctx = app_module.ScrapeContext(cache=cache)
+    app_module.fetch_upcoming_matches(ctx=ctx)
+    fake_db.reset_counts()
+    ctx.flush()
+    assert site.not_modified == 12
+    assert dict(fake_db.calls) == {"commit": 1} and fake_db.docs_written == 12
@@ -0,0 +1,82 @@
+"""HTML backends: identical records on the saved pages, and parse time / peak memory."""
+import gc
+import os
+import tracemalloc
+
+import pytest
+
+import sitegen
+from conftest import check_regression
+
+BACKENDS = ["lxml", "strainer", "soup"]
+DETAIL_TEAMS = ["DC", "MI"]  # the saved detail page's fixture
+
+def parse(index, backend, page, text):
+    px = index.html_backend(backend)
+    if page == "schedule":
+        return index.parse_schedule_page(px, px.parse(text, "fixture_anchor"))
+    if page == "detail":
+        return index.parse_detail_page(px, px.parse(text, "detail_root"), DETAIL_TEAMS)
+    return index.parse_results_page(px, px.parse(text, "result_anchor"))
+
+@pytest.mark.parametrize("page", ["results", "schedule", "detail"])
+def test_backends_agree_on_saved_pages(app_module, page):
+    text = sitegen.load(f"{page}.html")
+    out = {b: parse(app_module, b, page, text) for b in BACKENDS}
+    assert out["lxml"] == out["strainer"] == out["soup"]
+    assert out["soup"]
+
+def test_saved_results_page_parses_every_match(app_module):
+    records = parse(app_module, "soup", "results", sitegen.load("results.html"))
+    assert len(records) == 74
+    assert all(r.complete for r in records)
+    assert len({r.id for r in records}) == 74
+
+def test_saved_detail_page_reads_h2h_and_last_year(app_module):
+    stats = parse(app_module, "soup", "detail", sitegen.load("detail.html"))
+    h2h = stats["head_to_head"]
+    assert h2h["played"] == h2h["team1_wins"] + h2h["team2_wins"] > 0
+    assert len(stats["last_year_performance"]) == 2
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Benchmarks
+# ──────────────────────────────────────────────────────────────────────────────
+PAGES = {
+    "results": lambda: sitegen.load("results.html"),
+    "schedule": lambda: sitegen.load("schedule.html"),
+    "results_1000": lambda: sitegen.results_html(sitegen.season(n_past=1000, n_up=0)[0]),
+}
+
+def rss_bytes():
+    """Resident set size of this process (Linux), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def peak_memory(fn):
+    """(Python-heap peak from tracemalloc, RSS growth while the result is alive) in KiB.
+
+    tracemalloc does not see libxml2's C allocations, so for lxml the RSS
+    figure is the one to compare.
+    """
+    gc.collect()
+    rss0 = rss_bytes()
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss1 = rss_bytes()
+    del result
+    return peak // 1024, (rss1 - rss0) // 1024 if rss0 is not None else None
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", list(PAGES))
+def test_bench_parse(benchmark, app_module, page, backend):
+    text = PAGES[page]()
+    kind = "results" if page.startswith("results") else page
+    heap_kb, rss_kb = peak_memory(lambda: parse(app_module, backend, kind, text))
+    benchmark.extra_info.update(page_kb=len(text) // 1024, peak_heap_kb=heap_kb, rss_growth_kb=rss_kb)
+    benchmark(parse, app_module, backend, kind, text)
+    check_regression(benchmark, f"parse[{page}-{backend}]")
@@ -0,0 +1,94 @@
+"""ProbabilityEngine against the scalar compute_probabilities it replaced."""
+import copy
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+import sitegen
+from conftest import check_regression
+from reference import compute_probabilities_scalar
+
+def season_inputs(index, n_fixtures, seed=7, n_results=None):
+    """(records, standings, fixtures) for the saved results page and n_fixtures random fixtures."""
+    px = index.html_backend()
+    records = index.parse_results_page(px, px.parse(sitegen.load("results.html"), "result_anchor"))
+    if n_results is not None:
+        records = records[:n_results]
+    agg = index.StandingsAggregates()
+    agg.ingest(records)
+    standings = agg.standings()
+    rnd = random.Random(seed)
+    fixtures = []
+    for _ in range(n_fixtures):
+        (n1, a1), (n2, a2) = rnd.sample(sitegen.TEAMS, 2)
+        played = rnd.randint(0, 30)
+        w1 = rnd.randint(0, played)
+        fixtures.append({
+            # rows carry the site's abbreviations or full names; both resolve the same
+            "Team_1": rnd.choice([n1, a1]), "Team_2": rnd.choice([n2, a2]),
+            "head_to_head": {"played": played, "team1_wins": w1, "team2_wins": played - w1},
+            "last_year_performance": {n: {"win_pct": rnd.choice([50, round(rnd.uniform(10, 90), 2)])}
+                                      for n in (n1, n2) if rnd.random() < 0.8},
+        })
+    return records, standings, fixtures
+
+@pytest.mark.parametrize("n_results", [0, 1, 12, None])
+def test_matches_scalar_implementation(app_module, n_results):
+    records, standings, fixtures = season_inputs(app_module, 200, n_results=n_results)
+    expected = compute_probabilities_scalar(copy.deepcopy(fixtures), standings, [r.row() for r in records])
+    actual = app_module.compute_probabilities(copy.deepcopy(fixtures), standings, records)
+    assert [m["Probability"] for m in actual] == [m["Probability"] for m in expected]
+
+def test_team_missing_from_standings_scores_on_h2h_and_history(app_module):
+    records, standings, fixtures = season_inputs(app_module, 50)
+    standings = [s for s in standings if s["TEAM"] != "Mumbai Indians"]
+    expected = compute_probabilities_scalar(copy.deepcopy(fixtures), standings, [r.row() for r in records])
+    actual = app_module.compute_probabilities(copy.deepcopy(fixtures), standings, records)
+    assert [m["Probability"] for m in actual] == [m["Probability"] for m in expected]
+
+def assert_same_schedule(folded, rebuilt):
+    """Same distances, reachability and sos terms, whatever order each matrix holds its teams in."""
+    assert sorted(folded.nodes) == sorted(rebuilt.nodes)
+    idx = [folded.index[n] for n in rebuilt.nodes]
+    np.testing.assert_array_equal(folded.dist[np.ix_(idx, idx)], rebuilt.dist)
+    np.testing.assert_array_equal(folded.reach[np.ix_(idx, idx)], rebuilt.reach)
+    pairs = [(a, b) for a in rebuilt.nodes for b in rebuilt.nodes if a != b] + [("Mumbai Indians", "Nowhere XI")]
+    t1, t2 = zip(*pairs)
+    np.testing.assert_array_equal(folded.sos(t1, t2), rebuilt.sos(t1, t2))
+
+@pytest.mark.parametrize("n_results", [12, None])
+def test_results_folded_in_one_at_a_time_match_a_rebuild(app_module, n_results):
+    records, standings, _ = season_inputs(app_module, 0, n_results=n_results)
+    G = app_module.results_graph(standings, records)
+    start = nx.DiGraph()
+    start.add_nodes_from(t for t in G.nodes if not G.degree(t))  # add_result adds the others as they appear
+    folded = app_module.ScheduleMatrix(start)
+    for u, v in G.edges:
+        folded.add_result(u, v)
+        folded.add_result(u, v)  # a repeated result changes nothing
+    assert_same_schedule(folded, app_module.ScheduleMatrix(G))
+
+def test_warm_schedule_matrix_is_extended_not_rebuilt(app_module):
+    records, standings, _ = season_inputs(app_module, 0, n_results=20)
+    first = app_module.schedule_matrix(standings, records)
+    records, standings, _ = season_inputs(app_module, 0)
+    warm = app_module.schedule_matrix(standings, records)
+    assert warm is first
+    assert_same_schedule(warm, app_module.ScheduleMatrix(app_module.results_graph(standings, records)))
+
+    # fewer results than the warm matrix holds (a new season): rebuilt from scratch
+    records, standings, _ = season_inputs(app_module, 0, n_results=5)
+    assert app_module.schedule_matrix(standings, records) is not warm
+
+@pytest.mark.parametrize("impl", ["scalar", "vectorized"])
+@pytest.mark.parametrize("n", [70, 1000])
+def test_bench_probabilities(benchmark, app_module, impl, n):
+    records, standings, fixtures = season_inputs(app_module, n)
+    if impl == "scalar":
+        rows = [r.row() for r in records]
+        benchmark(compute_probabilities_scalar, fixtures, standings, rows)
+    else:
+        benchmark(app_module.compute_probabilities, fixtures, standings, records)
+    check_regression(benchmark, f"probabilities[{impl}-{n}]")
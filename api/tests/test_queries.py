@@ -0,0 +1,80 @@
+"""Match queries: cursor pagination, ties on ts, filters, projection and bad parameters."""
+from datetime import datetime, timedelta
+
+import pytest
+
+import sitegen
+
+VENUES = ["Wankhede, Mumbai", "Eden Gardens, Kolkata", "Chepauk, Chennai"]
+
+@pytest.fixture
+def stored(app_module, fake_db):
+    """30 past matches, three to an evening (so nine share each ts), over ten days from 1 Apr 2025."""
+    docs = []
+    for i in range(30):
+        a, b = sitegen.TEAMS[i % 10], sitegen.TEAMS[(i + 1 + i // 10) % 10]
+        m = {"Date_Time": sitegen.site_time(datetime(2025, 4, 1, 19, 30) + timedelta(days=i // 3)),
+             "Team_1": f"{a[0]} - 180/5 (20 ov)", "Team_2": f"{b[0]} - 170/8 (20 ov)",
+             "Venue": VENUES[i % 3], "Match": f"Match {i + 1}", "Result": f"{a[0]} beat {b[0]} by 10 runs"}
+        m["ts"], m["teams"] = app_module.match_epoch(m), app_module.match_teams(m)
+        fake_db.store[f"iplCache/matches/pastMatches/{app_module.match_id(m)}"] = m
+        docs.append(m)
+    return docs
+
+def walk(client, query):
+    """Every item of /api/matches?<query>, following nextCursor; also returns the page sizes."""
+    items, sizes, cursor = [], [], None
+    while True:
+        page = client.get(f"/api/matches?{query}" + (f"&cursor={cursor}" if cursor else "")).get_json()
+        items += page["items"]
+        sizes.append(len(page["items"]))
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return items, sizes
+
+def test_pages_cover_every_match_once_newest_first(client, stored):
+    items, sizes = walk(client, "limit=4")
+    assert sorted(m["Match"] for m in items) == sorted(m["Match"] for m in stored)
+    assert [m["ts"] for m in items] == sorted((m["ts"] for m in stored), reverse=True)
+    assert sizes == [4] * 7 + [2]
+
+def test_cursor_breaks_ties_on_ts_by_document_id(client, stored):
+    # page boundaries fall inside each run of three matches sharing a ts
+    items, _ = walk(client, "limit=2")
+    assert len(items) == len({m["Match"] for m in items}) == 30
+
+def test_upcoming_matches_run_oldest_first(client, fake_db, stored):
+    for path in list(fake_db.store):
+        fake_db.store[path.replace("pastMatches", "upcomingMatches")] = fake_db.store.pop(path)
+    page = client.get("/api/upcoming-matches?limit=5").get_json()
+    assert [m["ts"] for m in page["items"]] == sorted(m["ts"] for m in stored)[:5]
+
+def test_team_and_venue_filters(client, stored):
+    items, _ = walk(client, "team=MI&limit=3")
+    assert {m["Match"] for m in items} == {m["Match"] for m in stored if "Mumbai Indians" in m["teams"]}
+    items, _ = walk(client, f"venue={VENUES[1]}&team=CSK")
+    assert {m["Match"] for m in items} == {m["Match"] for m in stored
+                                           if m["Venue"] == VENUES[1] and "Chennai Super Kings" in m["teams"]}
+
+def test_date_range_includes_the_whole_last_day(client, stored):
+    items, _ = walk(client, "from=2025-04-03&to=2025-04-05")
+    assert sorted(m["Match"] for m in items) == sorted(m["Match"] for m in stored[6:15])
+
+def test_fields_projection(client, stored):
+    page = client.get("/api/matches?fields=Match,Result&limit=5").get_json()
+    assert all(set(m) == {"Match", "Result"} for m in page["items"])
+    assert page["nextCursor"]  # ts is still read for the cursor, just not returned
+    rest = client.get(f"/api/matches?fields=Match,Result&limit=50&cursor={page['nextCursor']}").get_json()
+    assert len(rest["items"]) == 25
+
+@pytest.mark.parametrize("query", ["limit=abc", "limit=0", "limit=-3", "cursor=yesterday", "from=someday",
+                                   "to=2025-13-40"])
+def test_bad_parameters_are_400(client, stored, query):
+    resp = client.get(f"/api/matches?{query}")
+    assert resp.status_code == 400 and "error" in resp.get_json()
+
+def test_limit_is_capped(client, app_module, fake_db, stored):
+    for i in range(app_module.MAX_PAGE_SIZE):
+        fake_db.store[f"iplCache/matches/pastMatches/extra{i}"] = dict(stored[0], Match=f"extra {i}")
+    page = client.get("/api/matches?limit=100000").get_json()
+    assert len(page["items"]) == app_module.MAX_PAGE_SIZE and page["nextCursor"]
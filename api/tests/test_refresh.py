@@ -0,0 +1,194 @@
+"""Refresh pipeline end to end, offline, and its benchmarks at three scales."""
+import copy
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import sitegen
+from conftest import check_regression, serve_season
+
+# full/incremental: Firestore RPC budget of a cold and a no-change refresh
+SCALES = {
+    # a regular IPL season: 74 results, the 20 fixtures left on the schedule
+    "one_season": {"n_past": 74, "n_up": 20, "archive": None, "full": 10, "incremental": 7},
+    # the same, with ten earlier seasons archived so fixtures skip their detail pages
+    "ten_seasons": {"n_past": 74, "n_up": 20, "archive": range(2015, 2025), "full": 10, "incremental": 7},
+    # over 500 writes: the match sets split across two batches
+    "1000_fixtures": {"n_past": 900, "n_up": 100, "archive": None, "full": 12, "incremental": 7},
+}
+
+def refresh(index):
+    return index.refresh_if_needed(index.ScrapeContext())
+
+def force_next(fake_db):
+    """Age lastUpdated past a day, so the next refresh is the daily forced one."""
+    fake_db.store["iplCache/metadata"]["lastUpdated"] = datetime.now(timezone.utc) - timedelta(days=2)
+
+def test_cold_refresh_fills_every_doc(app_module, fake_db, site):
+    serve_season(site, n_past=30, n_up=10)
+    teams, past, up = refresh(app_module)
+    assert len(past) == 30 and len(up) == 10
+    assert [t["POS"] for t in teams] == list(range(1, len(teams) + 1))
+    # every result counts once for each side, and a win for one of them unless there was none
+    assert sum(t["P"] for t in teams) == 2 * len(past)
+    assert sum(t["W"] for t in teams) == sum(1 for m in past if " beat " in m["Result"] or "Super Over" in m["Result"])
+    for doc in ("metadata", "standings", "aggregates", "playoffOdds", "archive"):
+        assert f"iplCache/{doc}" in fake_db.store
+    assert fake_db.store["iplCache/views/docs/upcomingMatches"]["count"] == 10
+
+def test_incremental_refresh_writes_no_matches(app_module, fake_db, site):
+    serve_season(site, n_past=30, n_up=10)
+    refresh(app_module)
+    ctx = app_module.ScrapeContext()
+    app_module.refresh_if_needed(ctx)
+    assert ctx.metrics.counters["matches_written"] == 0
+    assert site.not_modified == 0  # no page cache: pages are fetched again, but nothing changed
+
+def test_new_result_moves_fixture_and_updates_standings(app_module, fake_db, site):
+    past, up = serve_season(site, n_past=30, n_up=10)
+    refresh(app_module)
+    played = sum(t["P"] for t in fake_db.store["iplCache/standings"]["teams"])
+    more, _ = sitegen.season(n_past=31, n_up=0)
+    site.pages[sitegen.RESULTS_PATH] = sitegen.results_html(more)
+    refresh(app_module)
+    assert len([p for p in fake_db.store if p.startswith("iplCache/matches/pastMatches/")]) == 31
+    assert sum(t["P"] for t in fake_db.store["iplCache/standings"]["teams"]) == played + 2
+
+def test_new_results_rescore_stored_fixtures(app_module, fake_db, site):
+    serve_season(site, n_past=30, n_up=10)
+    refresh(app_module)
+    before = {m["Match"]: m["Probability"] for m in fake_db.store["iplCache/views/docs/upcomingMatches"]["items"]}
+    more, _ = sitegen.season(n_past=66, n_up=0)
+    site.pages[sitegen.RESULTS_PATH] = sitegen.results_html(more)
+    refresh(app_module)  # not forced: 36 new results since the last one
+
+    fresh = {m["Match"]: m["Probability"] for m in app_module.fetch_upcoming_matches(ctx=app_module.ScrapeContext())}
+    served = {m["Match"]: m["Probability"] for m in fake_db.store["iplCache/views/docs/upcomingMatches"]["items"]}
+    stored = {d["Match"]: d["Probability"] for p, d in fake_db.store.items()
+              if p.startswith("iplCache/matches/upcomingMatches/")}
+    assert served == stored == fresh != before
+
+def test_refresh_endpoint_reports_metrics(client, fake_db, site):
+    serve_season(site, n_past=10, n_up=4)
+    body = client.get("/api/refresh").get_json()
+    assert body["status"] == "ok"
+    assert body["metrics"]["counters"]["http_requests"] == 2 + 4
+    assert client.get("/api/standings").status_code == 200
+
+def test_refresh_behind_a_running_one(client, fake_db, site):
+    serve_season(site, n_past=10, n_up=4)
+    lock = fake_db.store["iplCache/refreshLock"] = {"holder": "another instance", "expires": time.time() + 60}
+    resp = client.get("/api/refresh")  # waits REFRESH_WAIT_SECONDS, then gives up
+    assert resp.status_code == 503 and resp.get_json()["status"] == "busy"
+    assert "iplCache/standings" not in fake_db.store
+
+    lock["expires"] = time.time() + 1  # the other refresh finishes while this one waits
+    body = client.get("/api/refresh").get_json()
+    assert body["status"] == "shared"
+
+def test_failed_refresh_backs_off(app_module, fake_db, site, monkeypatch):
+    serve_season(site, n_past=10, n_up=4)
+    refresh(app_module)
+    monkeypatch.setattr(app_module, "STALE_AFTER_HOURS", 6)
+    md = fake_db.store["iplCache/metadata"]
+    md["lastChecked"] = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    assert app_module.is_stale(md)
+
+    def fail(ctx=None):
+        raise RuntimeError("429 Too Many Requests")
+    real = app_module.refresh_if_needed
+    monkeypatch.setattr(app_module, "refresh_if_needed", fail)
+    with pytest.raises(RuntimeError):
+        app_module.run_refresh()
+    md = fake_db.store["iplCache/metadata"]
+    assert md["failures"] == 1 and not app_module.is_stale(md)
+
+    md["lastAttempt"] = datetime.now(timezone.utc) - timedelta(seconds=app_module.REFRESH_BACKOFF_SECONDS + 1)
+    assert app_module.is_stale(md)
+    md["failures"] = 2  # the wait doubles with each failure in a row
+    assert not app_module.is_stale(md)
+
+    monkeypatch.setattr(app_module, "refresh_if_needed", real)
+    refresh(app_module)
+    assert fake_db.store["iplCache/metadata"]["failures"] == 0
+
+def test_aggregates_are_checked_on_the_daily_refresh(app_module, fake_db, site):
+    serve_season(site, n_past=20, n_up=4)
+    refresh(app_module)
+    good = fake_db.store["iplCache/standings"]["teams"]
+    agg = fake_db.store["iplCache/aggregates"]
+    assert agg["season"] == 2025 and len(agg["applied"]) == 20
+
+    team = next(iter(agg["teams"]))
+    agg["teams"][team]["wins"] += 5
+    refresh(app_module)  # not forced: the ingested aggregates are trusted
+    assert fake_db.store["iplCache/aggregates"]["teams"][team] == agg["teams"][team]
+    assert fake_db.store["iplCache/standings"]["teams"] != good
+
+    force_next(fake_db)
+    refresh(app_module)
+    assert fake_db.store["iplCache/standings"]["teams"] == good
+
+    agg = fake_db.store["iplCache/aggregates"]
+    agg["season"], agg["applied"] = 2024, agg["applied"] + ["last-season-final"]
+    refresh(app_module)
+    agg = fake_db.store["iplCache/aggregates"]
+    assert agg["season"] == 2025 and "last-season-final" not in agg["applied"]
+
+def test_changed_standings_move_last_updated(app_module, fake_db, site):
+    past, _ = serve_season(site, n_past=20, n_up=4)
+    refresh(app_module)
+    md = fake_db.store["iplCache/metadata"]
+    md["lastUpdated"] = hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    odds = fake_db.store["iplCache/playoffOdds"]
+    standings = fake_db.store["iplCache/standings"]["teams"]
+
+    # an old scorecard is corrected: no new match is after lastPastMatch, but the table changes
+    past[0]["s1"] = str(int(past[0]["s1"].split("/")[0]) + 30) + "/" + past[0]["s1"].split("/")[1]
+    site.pages[sitegen.RESULTS_PATH] = sitegen.results_html(past)
+    ctx = app_module.ScrapeContext()
+    app_module.refresh_if_needed(ctx)
+
+    assert ctx.metrics.counters["matches_written"] == 0
+    assert fake_db.store["iplCache/standings"]["teams"] != standings
+    assert fake_db.store["iplCache/metadata"]["lastUpdated"] > hour_ago
+    assert fake_db.store["iplCache/playoffOdds"] is not odds
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Benchmarks
+# ──────────────────────────────────────────────────────────────────────────────
+def _seed(index, monkeypatch, site, scale):
+    """Serve the scale's season; returns the Firestore contents a cold refresh starts from."""
+    spec = SCALES[scale]
+    serve_season(site, n_past=spec["n_past"], n_up=spec["n_up"])
+    if spec["archive"] is None:
+        return {}
+    monkeypatch.setattr(index, "ARCHIVE_FIRST_SEASON", spec["archive"].start)
+    archive = index.build_archive(sitegen.seasons(spec["archive"]))
+    return {"iplCache/archive": archive.to_doc()}
+
+@pytest.mark.parametrize("scale", list(SCALES))
+def test_bench_full_refresh(benchmark, app_module, fake_db, site, monkeypatch, scale):
+    start = _seed(app_module, monkeypatch, site, scale)
+
+    def setup():
+        fake_db.store = copy.deepcopy(start)
+        fake_db.reset_counts()
+
+    benchmark.pedantic(refresh, args=(app_module,), setup=setup, rounds=5 if scale == "1000_fixtures" else 10)
+    benchmark.extra_info.update(rpcs=fake_db.rpcs, docs_read=fake_db.docs_read, docs_written=fake_db.docs_written)
+    assert fake_db.rpcs <= SCALES[scale]["full"]
+    check_regression(benchmark, f"full_refresh[{scale}]")
+
+@pytest.mark.parametrize("scale", list(SCALES))
+def test_bench_incremental_refresh(benchmark, app_module, fake_db, site, monkeypatch, scale):
+    fake_db.store = _seed(app_module, monkeypatch, site, scale)
+    refresh(app_module)
+    fake_db.reset_counts()
+
+    benchmark.pedantic(refresh, args=(app_module,), setup=fake_db.reset_counts,
+                       rounds=5 if scale == "1000_fixtures" else 10)
+    benchmark.extra_info.update(rpcs=fake_db.rpcs, docs_read=fake_db.docs_read, docs_written=fake_db.docs_written)
+    assert fake_db.rpcs <= SCALES[scale]["incremental"]
+    check_regression(benchmark, f"incremental_refresh[{scale}]")
@@ -0,0 +1,102 @@
+"""Read endpoints through ResponseCache: ETags and 304s, compression, and lastUpdated re-reads."""
+import gzip
+import json
+
+import pytest
+
+import sitegen
+from conftest import serve_season
+
+@pytest.fixture
+def season(client, site):
+    """A refreshed season; returns its (past, upcoming) as served by the stub site."""
+    past, up = serve_season(site, n_past=30, n_up=10)
+    assert client.get("/api/refresh").status_code == 200
+    return past, up
+
+def test_etag_and_not_modified(client, season):
+    first = client.get("/api/standings")
+    etag = first.headers["ETag"]
+    again = client.get("/api/standings", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == etag
+    assert "must-revalidate" in again.headers["Cache-Control"]
+
+@pytest.mark.parametrize("accept, encoding", [("gzip", "gzip"), ("", None), ("identity", None)])
+def test_content_encoding_follows_accept_encoding(client, season, accept, encoding):
+    plain = client.get("/api/matches").data
+    resp = client.get("/api/matches", headers={"Accept-Encoding": accept})
+    assert resp.headers.get("Content-Encoding") == encoding
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    assert (gzip.decompress(resp.data) if encoding else resp.data) == plain
+
+def test_brotli_preferred_when_available(client, season):
+    brotli = pytest.importorskip("brotli")
+    resp = client.get("/api/matches", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(resp.data)) == client.get("/api/matches").get_json()
+
+def test_gzip_without_brotli(app_module, client, season, monkeypatch):
+    monkeypatch.setattr(app_module, "brotli", None)
+    resp = client.get("/api/matches", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+
+def test_small_bodies_are_not_compressed(client, season):
+    resp = client.get("/api/metadata", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+
+def test_metadata_is_reread_once_per_ttl(app_module, client, fake_db, season):
+    client.get("/api/standings")
+    fake_db.reset_counts()
+    for _ in range(5):
+        assert client.get("/api/standings").status_code == 200
+    assert fake_db.rpcs == 0  # within the ttl: cached version, cached body
+
+    app_module.response_cache._checked -= app_module.response_cache.ttl
+    client.get("/api/standings")
+    assert dict(fake_db.calls) == {"get": 1}  # the metadata doc; lastUpdated is unchanged, so is the body
+
+def test_refresh_invalidates_within_the_ttl(client, site, season):
+    etag = client.get("/api/standings").headers["ETag"]
+    more, _ = sitegen.season(n_past=40, n_up=0)
+    site.pages[sitegen.RESULTS_PATH] = sitegen.results_html(more)
+    client.get("/api/refresh")
+
+    resp = client.get("/api/standings", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert sum(t["P"] for t in resp.get_json()) == 2 * 40
+
+# ──────────────────────────────────────────────────────────────────────────────
+# /api/dashboard: one gzip payload, ETag from lastUpdated alone
+# ──────────────────────────────────────────────────────────────────────────────
+def test_dashboard_is_one_compressed_payload(client, season):
+    past, up = season
+    resp = client.get("/api/dashboard", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    body = json.loads(gzip.decompress(resp.data))
+    assert body["standings"] == client.get("/api/standings").get_json()
+    assert body["matches"] == client.get("/api/matches").get_json() and len(body["matches"]) == len(past)
+    assert body["upcomingMatches"] == client.get("/api/upcoming-matches").get_json()
+    assert body["lastUpdated"] == client.get("/api/metadata").get_json()["lastUpdated"]
+
+def test_dashboard_etag_answers_304_without_building(app_module, client, fake_db, season):
+    etag = client.get("/api/dashboard").headers["ETag"]
+    app_module.response_cache.bodies.clear()
+    fake_db.reset_counts()
+    resp = client.get("/api/dashboard", headers={"If-None-Match": etag})
+    assert resp.status_code == 304 and fake_db.rpcs == 0
+
+def test_dashboard_etag_changes_when_a_refresh_changes_the_table(client, site, fake_db, season):
+    past, _ = season
+    etag = client.get("/api/dashboard").headers["ETag"]
+    standings = fake_db.store["iplCache/standings"]["teams"]
+
+    # a corrected old scorecard: no new match document, but a different table
+    runs, _, wickets = past[0]["s1"].partition("/")
+    past[0]["s1"] = f"{int(runs) + 30}/{wickets}" if wickets else str(int(runs) + 30)
+    site.pages[sitegen.RESULTS_PATH] = sitegen.results_html(past)
+    client.get("/api/refresh")
+
+    resp = client.get("/api/dashboard", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["standings"] == fake_db.store["iplCache/standings"]["teams"] != standings
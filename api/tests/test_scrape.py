@@ -0,0 +1,46 @@
+"""Concurrent fixture detail fetches against the stub site: order, retries, speedup."""
+import time
+
+import pytest
+
+import sitegen
+from conftest import check_regression, serve_season
+
+LATENCY = 0.05  # seconds the stub site takes per page
+
+def fetch_upcoming(index, concurrency):
+    return index.fetch_upcoming_matches(ctx=index.ScrapeContext(concurrency=concurrency))
+
+def test_results_keep_schedule_order(app_module, site):
+    _, up = serve_season(site, n_past=0, n_up=20)
+    site.latency = 0.01
+    rows = fetch_upcoming(app_module, 8)
+    assert [r["Match"] for r in rows] == [m["num"] for m in up]
+    assert [r["head_to_head"]["played"] for r in rows] == [m["played"] for m in up]
+    assert all(site.hits[m["href"]] == 1 for m in up)
+
+def test_failed_detail_page_is_retried(app_module, site):
+    _, up = serve_season(site, n_past=0, n_up=3)
+    site.failures[up[1]["href"]] = 2
+    rows = fetch_upcoming(app_module, 8)
+    assert site.hits[up[1]["href"]] == 3
+    assert rows[1]["head_to_head"]["played"] == up[1]["played"]
+
+def test_concurrent_fetch_beats_serial(app_module, site):
+    serve_season(site, n_past=0, n_up=20)
+    site.latency = LATENCY
+    t0 = time.perf_counter()
+    serial = fetch_upcoming(app_module, 1)
+    t1 = time.perf_counter()
+    concurrent = fetch_upcoming(app_module, 8)
+    t2 = time.perf_counter()
+    assert concurrent == serial
+    assert (t1 - t0) / (t2 - t1) >= 3
+
+@pytest.mark.parametrize("concurrency", [1, 4, 8, 16])
+def test_bench_detail_fetch(benchmark, app_module, site, concurrency):
+    serve_season(site, n_past=0, n_up=20)
+    site.latency = LATENCY
+    benchmark.pedantic(fetch_upcoming, args=(app_module, concurrency), rounds=5)
+    benchmark.extra_info.update(fixtures=20, latency_ms=LATENCY * 1000, requests=site.requests // 5)
+    check_regression(benchmark, f"detail_fetch[{concurrency}]")
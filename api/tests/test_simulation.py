@@ -0,0 +1,43 @@
+"""Playoff simulation: fresh fixture probabilities, and worker processes that never fork."""
+from datetime import datetime, timedelta, timezone
+
+from conftest import serve_season
+
+def test_simulation_rescores_stored_fixtures(app_module, fake_db, site, monkeypatch):
+    serve_season(site, n_past=20, n_up=6)
+    app_module.refresh_if_needed(app_module.ScrapeContext())
+    prefix = "iplCache/matches/upcomingMatches/"
+    for path, doc in fake_db.store.items():
+        if path.startswith(prefix):
+            doc["Probability"] = {"Team_1": 95.0, "Team_2": 5.0}  # scored against an older table
+    fake_db.store["iplCache/metadata"]["lastUpdated"] = datetime.now(timezone.utc) - timedelta(days=2)
+
+    seen = []
+    real = app_module.simulate_playoffs
+    monkeypatch.setattr(app_module, "simulate_playoffs", lambda teams, fixtures: seen.append(fixtures) or real(teams, fixtures))
+    app_module.refresh_if_needed(app_module.ScrapeContext())
+
+    fixtures = seen[0]
+    assert len(fixtures) == 6
+    assert not any(m["Probability"] == {"Team_1": 95.0, "Team_2": 5.0} for m in fixtures)
+
+def test_simulator_runs_in_process_by_default(app_module):
+    assert app_module.SIM_WORKERS == 1
+    assert app_module._sim_pool(1) is None
+
+def test_worker_pool_does_not_fork(app_module):
+    pool = app_module._sim_pool(2)
+    try:
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        pool.shutdown()
+
+def test_worker_processes_give_the_in_process_result(app_module):
+    standings = [{"TEAM": t, "P": 10, "W": w, "L": 10 - w, "NR": 0, "NRR": (w - 5) / 10, "PTS": 2 * w}
+                 for t, w in zip(app_module.canonical_teams, range(10))]
+    teams = app_module.canonical_teams
+    fixtures = [{"Team_1": teams[i], "Team_2": teams[(i + 3) % 10], "Probability": {"Team_1": 55.0, "Team_2": 45.0}}
+                for i in range(10)]
+    kw = {"seed": 3, "max_runs": 20000, "tol": 1e-9, "batch": 5000}
+    assert app_module.simulate_playoffs(standings, fixtures, workers=2, **kw) == \
+        app_module.simulate_playoffs(standings, fixtures, workers=1, **kw)
@@ -0,0 +1,43 @@
+"""TeamResolver: alias hits, fuzzy fallbacks, negative caching and the memo bound."""
+import pytest
+
+@pytest.fixture
+def resolver(app_module):
+    def make(memo_size=512):
+        return app_module.TeamResolver(app_module.team_abbr_map, app_module.canonical_teams, memo_size=memo_size)
+    return make
+
+def test_aliases_hit_without_fuzzy_matching(resolver):
+    r = resolver()
+    assert r.resolve("MI") == r.resolve("  mumbai indians ") == "Mumbai Indians"
+    assert r.resolve("Kings XI Punjab") == "Punjab Kings"
+    assert r.resolve("") == ""
+    assert r.stats() == {"hits": 3, "misses": 0, "fuzzy_fallbacks": 0, "unresolved": 0, "drifted_names": []}
+
+def test_fuzzy_match_is_memoized(app_module, resolver, monkeypatch):
+    r = resolver()
+    assert r.resolve("Super Kings Chennai") == "Chennai Super Kings"
+    calls = []
+    monkeypatch.setattr(app_module.process, "extractOne", lambda *a, **kw: calls.append(a) or (None, 0))
+    assert r.resolve("super kings chennai") == "Chennai Super Kings"
+    assert calls == []
+    assert r.stats() == {"hits": 0, "misses": 2, "fuzzy_fallbacks": 1, "unresolved": 0,
+                         "drifted_names": ["super kings chennai"]}
+
+def test_unresolved_names_are_cached_too(app_module, resolver, monkeypatch):
+    r = resolver()
+    assert r.resolve("Nowhere XI") == "Nowhere XI"
+    monkeypatch.setattr(app_module.process, "extractOne", pytest.fail)
+    assert r.resolve("Nowhere XI") == "Nowhere XI"  # the miss is answered from the memo
+    assert r.stats()["misses"] == 2
+    assert r.stats()["fuzzy_fallbacks"] == r.stats()["unresolved"] == 1
+
+def test_memo_drops_the_least_recently_used_name(resolver):
+    r = resolver(memo_size=2)
+    r.resolve("Nowhere XI")
+    r.resolve("Super Kings Chennai")
+    r.resolve("Nowhere XI")  # now the most recent
+    r.resolve("Indians Mumbai")
+    assert list(r.memo) == ["nowhere xi", "indians mumbai"]
+    r.resolve("Super Kings Chennai")  # evicted, so matched again
+    assert r.fuzzy_fallbacks == 4 and len(r.memo) == 2
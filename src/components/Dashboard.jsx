@@ -93,6 +93,9 @@ const getTeamLogo = (teamName) => {
   return team.logo;
 };
 
+// How long after a fixture's start the live stream stays open (matches LIVE_WINDOW_HOURS on the API)
+const LIVE_WINDOW_MS = 5 * 60 * 60 * 1000;
+
 // IPL Points Table Component
 const IPLPointsTable = ({ favoriteTeam }) => {
   const [standings, setStandings] = useState([]);
@@ -105,28 +108,20 @@ const IPLPointsTable = ({ favoriteTeam }) => {
   const [showAllUpcomingMatches, setShowAllUpcomingMatches] = useState(false);  
   const [lastRefreshed, setLastRefreshed] = useState(null);
   const [loadingRefresh, setLoadingRefresh]   = useState(false);
+  const [live, setLive] = useState(null);
   const fetchAll = async () => {
         setLoading(true);
         try {
-          const [stRes, pastRes, upRes, metaRes] = await Promise.all([
-            fetch("/api/standings"),
-            fetch("/api/matches"),
-            fetch("/api/upcoming-matches"),
-            fetch("/api/metadata"),
-          ]);
-          if (!stRes.ok || !pastRes.ok || !upRes.ok || !metaRes.ok) {
-           throw new Error("One of the fetches failed");
+          // one round trip for standings, matches, fixtures and lastUpdated
+          const res = await fetch("/api/dashboard");
+          if (!res.ok) {
+           throw new Error("Dashboard fetch failed");
           }
-          const [stData, pastData, upData, metaData] = await Promise.all([
-            stRes.json(),
-            pastRes.json(),
-            upRes.json(),
-           metaRes.json(),
-          ]);
-          setStandings(stData);
-          setPastMatches(pastData);
-          setUpcomingMatches(upData);
-          setLastRefreshed(metaData.lastUpdated);
+          const data = await res.json();
+          setStandings(data.standings);
+          setPastMatches(data.matches);
+          setUpcomingMatches(data.upcomingMatches);
+          setLastRefreshed(data.lastUpdated);
           setError(null);
         } catch (err) {
           setError(err.message);
@@ -155,6 +150,42 @@ const IPLPointsTable = ({ favoriteTeam }) => {
   useEffect(() => {
     fetchAll();
   }, []);
+
+  // 4️⃣ Live score of the match in progress: a snapshot, then only the fields that changed.
+  // The stream is only opened while an upcoming fixture is inside its live window.
+  const [liveWindowOpen, setLiveWindowOpen] = useState(false);
+  useEffect(() => {
+    const starts = upcomingMatches.map(m => m.ts * 1000).filter(Boolean);
+    let timer;
+    const check = () => {
+      const now = Date.now();
+      setLiveWindowOpen(starts.some(t => t <= now && now - t <= LIVE_WINDOW_MS));
+      // wake up again at the next start or end of a window
+      const next = Math.min(...starts.flatMap(t => [t, t + LIVE_WINDOW_MS]).filter(t => t > now));
+      if (isFinite(next)) timer = setTimeout(check, Math.min(next - now + 1000, 2 ** 31 - 1));
+    };
+    check();
+    return () => clearTimeout(timer);
+  }, [upcomingMatches]);
+
+  useEffect(() => {
+    if (!liveWindowOpen) {
+      setLive(null);
+      return;
+    }
+    const source = new EventSource("/api/live/stream");
+    const apply = (e) => {
+      const data = JSON.parse(e.data);
+      setLive(prev =>
+        data
+          ? { match: data.match, fields: { ...(prev && prev.match === data.match ? prev.fields : {}), ...data.fields } }
+          : null
+      );
+    };
+    source.addEventListener("snapshot", apply);
+    source.addEventListener("delta", apply);
+    return () => source.close();
+  }, [liveWindowOpen]);
   const getSimulatedStandings = () => {
     // Deep-clone current table rows
     const sim = standings.map(r => ({
@@ -402,6 +433,16 @@ const teamColors = {
         </table>
       </div>
 
+      {/* Live Match */}
+      {live && (
+        <div className="bg-white text-black rounded-lg p-4 mt-8 match-card">
+          <div className="text-xs font-bold text-[#e91e63] mb-1">● LIVE</div>
+          <div className="font-semibold">{live.fields.Team_1}</div>
+          <div className="font-semibold">{live.fields.Team_2}</div>
+          {live.fields.Status && <div className="text-sm text-gray-600 mt-1">{live.fields.Status}</div>}
+        </div>
+      )}
+
       {/* Upcoming Matches Section */}
       <h2 className="text-2xl font-bold text-[#f5a623] mt-8 mb-4">IPL 2025 Upcoming Matches</h2>
       {upcomingMatches.length > 0 ? (